@@ -0,0 +1,217 @@
+"""
+Perft (performance test) for the move generator: counts the leaf nodes of the legal move tree to a given depth from a
+set of known positions, and compares both the counts and the nodes per second against stored baselines.
+
+The counts follow this engine's rules, i.e. no castling or en passant and pawns always promote to a Queen, so they
+only match the published perft numbers for positions and depths where those moves can't occur.
+
+Usage:
+    python -m rl_chess.benchmark.PerftBenchmark --depth 3
+    python -m rl_chess.benchmark.PerftBenchmark --positions start --depth 4 --divide
+    python -m rl_chess.benchmark.PerftBenchmark --depth 3 --update-baselines
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+from rl_chess.domain.board.BitBoard import BitBoard
+from rl_chess.domain.board.ChessBoard import ChessBoard
+from rl_chess.enums.Enums import PieceType
+from rl_chess.service.GameRecordFormat import get_move_name
+from rl_chess.service.PieceMovementService import PieceMovementService
+from rl_chess.simulation.CheckMateSimulation import CheckMateSimulation
+from rl_chess.simulation.PathBlockSimulation import PathBlockSimulation
+from rl_chess.simulation.PawnPromotionSimulation import PawnPromotionSimulation
+
+DEFAULT_BASELINES_PATH = os.path.join(os.path.dirname(__file__), "baselines", "perft.json")
+
+# timings of runs shorter than this are too noisy to compare against a baseline
+MIN_TIMED_SECONDS = 0.1
+
+
+def set_up_promotion_race(chess_board: ChessBoard) -> None:
+    chess_board.load_fen("k7/5P2/8/8/8/8/2p5/7K w - - 0 1")
+
+
+POSITIONS = {
+    "start": ChessBoard.reset,
+    "check_mate": CheckMateSimulation.set_up,
+    "path_block": PathBlockSimulation.set_up,
+    "pawn_promotion": PawnPromotionSimulation.set_up,
+    "promotion_race": set_up_promotion_race,
+    "start_bitboard": ChessBoard.reset,
+}
+
+# positions set up on another board class than ChessBoard, to compare the move generator across board representations
+BOARD_CLASSES = {
+    "start_bitboard": BitBoard,
+}
+
+
+def set_up_position(position_name: str) -> ChessBoard:
+    chess_board = BOARD_CLASSES.get(position_name, ChessBoard)()
+    POSITIONS[position_name](chess_board)
+    return chess_board
+
+
+class PerftBenchmark:
+
+    def __init__(self, piece_movement_service: PieceMovementService = None, use_cache: bool = False):
+        self.piece_movement_service = piece_movement_service or PieceMovementService()
+        # the legal move cache hides the cost of move generation on transpositions, so it is off by default
+        self.use_cache = use_cache
+
+    def get_moves(self, chess_board: ChessBoard) -> [(int, int, int, int)]:
+        color = chess_board.side_to_move
+        if self.use_cache:
+            return list(self.piece_movement_service.get_legal_moves(color, chess_board))
+
+        return [(piece.coords[0], piece.coords[1], destination_y, destination_x)
+                for piece, moves in self.piece_movement_service.get_possible_moves_by_piece(color, chess_board)
+                for destination_y, destination_x in moves]
+
+    @staticmethod
+    def make_move(chess_board: ChessBoard, move: (int, int, int, int)) -> int:
+        # mirror PieceMovementService.move_piece, which always promotes to a Queen
+        piece = chess_board.get_occupant_from_tile(move[0], move[1])
+        promotion_type = PieceType.QUEEN if piece.type_code == PieceType.PAWN and move[2] in (0, 7) else None
+        return chess_board.make_move(move, promotion_type)
+
+    def perft(self, chess_board: ChessBoard, depth: int) -> int:
+        if depth == 0:
+            return 1
+
+        moves = self.get_moves(chess_board)
+        if depth == 1:
+            return len(moves)
+
+        nodes = 0
+        for move in moves:
+            undo_token = self.make_move(chess_board, move)
+            nodes += self.perft(chess_board, depth - 1)
+            chess_board.unmake_move(undo_token)
+        return nodes
+
+    def divide(self, chess_board: ChessBoard, depth: int) -> {str: int}:
+        """
+        Returns the perft count below each legal move of the position, the usual way to narrow down a wrong count.
+        """
+        nodes_by_move = {}
+        for move in sorted(self.get_moves(chess_board)):
+            undo_token = self.make_move(chess_board, move)
+            nodes_by_move[get_move_name(move)] = self.perft(chess_board, depth - 1)
+            chess_board.unmake_move(undo_token)
+        return nodes_by_move
+
+    def run_position(self, position_name: str, max_depth: int) -> [{}]:
+        chess_board = set_up_position(position_name)
+
+        results = []
+        for depth in range(1, max_depth + 1):
+            start_time = time.perf_counter()
+            nodes = self.perft(chess_board, depth)
+            seconds = time.perf_counter() - start_time
+            results.append({
+                "depth": depth,
+                "nodes": nodes,
+                "seconds": seconds,
+                "nodes_per_second": nodes / seconds if seconds > 0 else 0.0
+            })
+        return results
+
+    @staticmethod
+    def compare_with_baselines(position_name: str, results: [{}], baselines: {}, tolerance: float) -> [str]:
+        """
+        :param tolerance: accepted slowdown as a fraction of the baseline nodes per second, e.g. 0.5 for 50%
+        :return: description of every regression found, empty if there are none
+        """
+        regressions = []
+        position_baselines = baselines.get(position_name, {})
+        expected_nodes = position_baselines.get("expected_nodes", {})
+        baseline_speeds = position_baselines.get("nodes_per_second", {})
+
+        for result in results:
+            depth = str(result["depth"])
+            if depth in expected_nodes and expected_nodes[depth] != result["nodes"]:
+                regressions.append(f"{position_name} depth {depth}: expected {expected_nodes[depth]} nodes, "
+                                   f"counted {result['nodes']}")
+            if depth in baseline_speeds and result["seconds"] >= MIN_TIMED_SECONDS \
+                    and result["nodes_per_second"] < baseline_speeds[depth] * (1 - tolerance):
+                regressions.append(f"{position_name} depth {depth}: {result['nodes_per_second']:.0f} nodes/s is "
+                                   f"more than {tolerance:.0%} below the baseline of {baseline_speeds[depth]:.0f}")
+        return regressions
+
+    @staticmethod
+    def load_baselines(path: str) -> {}:
+        if not os.path.exists(path):
+            return {}
+        with open(path) as baselines_file:
+            return json.load(baselines_file)
+
+    @staticmethod
+    def save_baselines(path: str, baselines: {}) -> None:
+        with open(path, "w") as baselines_file:
+            json.dump(baselines, baselines_file, indent=2, sort_keys=True)
+            baselines_file.write("\n")
+
+    @staticmethod
+    def update_baselines(position_name: str, results: [{}], baselines: {}) -> None:
+        position_baselines = baselines.setdefault(position_name, {})
+        expected_nodes = position_baselines.setdefault("expected_nodes", {})
+        baseline_speeds = position_baselines.setdefault("nodes_per_second", {})
+        for result in results:
+            # published counts already in the file are kept, only missing depths are filled in
+            expected_nodes.setdefault(str(result["depth"]), result["nodes"])
+            if result["seconds"] >= MIN_TIMED_SECONDS:
+                baseline_speeds[str(result["depth"])] = round(result["nodes_per_second"])
+            else:
+                # a depth that has become too fast to time would otherwise keep comparing against its old speed
+                baseline_speeds.pop(str(result["depth"]), None)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Count and time legal move tree leaves from known positions.")
+    parser.add_argument("--depth", type=int, default=3, help="maximum depth to search (default: 3)")
+    parser.add_argument("--positions", nargs="+", choices=sorted(POSITIONS), default=sorted(POSITIONS))
+    parser.add_argument("--divide", action="store_true", help="print the node count below every root move")
+    parser.add_argument("--use-cache", action="store_true", help="generate moves through the legal move cache")
+    parser.add_argument("--baselines", default=DEFAULT_BASELINES_PATH, help="JSON file with expected counts and speeds")
+    parser.add_argument("--update-baselines", action="store_true", help="store this run's results as the baselines")
+    parser.add_argument("--tolerance", type=float, default=0.5,
+                        help="accepted slowdown against the baseline nodes per second (default: 0.5)")
+    args = parser.parse_args(argv)
+
+    perft_benchmark = PerftBenchmark(use_cache=args.use_cache)
+    baselines = PerftBenchmark.load_baselines(args.baselines)
+    regressions = []
+
+    for position_name in args.positions:
+        print(f"Position {position_name}")
+        results = perft_benchmark.run_position(position_name, args.depth)
+        for result in results:
+            print(f"  depth {result['depth']}: {result['nodes']:>10} nodes in {result['seconds']:8.3f}s "
+                  f"({result['nodes_per_second']:,.0f} nodes/s)")
+
+        if args.divide:
+            chess_board = set_up_position(position_name)
+            for move_name, nodes in perft_benchmark.divide(chess_board, args.depth).items():
+                print(f"  {move_name}: {nodes}")
+
+        if args.update_baselines:
+            PerftBenchmark.update_baselines(position_name, results, baselines)
+        else:
+            regressions += PerftBenchmark.compare_with_baselines(position_name, results, baselines, args.tolerance)
+
+    if args.update_baselines:
+        PerftBenchmark.save_baselines(args.baselines, baselines)
+        print(f"Baselines written to {args.baselines}")
+
+    for regression in regressions:
+        print(f"REGRESSION: {regression}")
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
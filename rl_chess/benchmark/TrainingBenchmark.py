@@ -0,0 +1,327 @@
+"""
+Throughput benchmark of the training loop: times the environment (AgentService.get_state, is_action_legal and step),
+the model (DQN.act single-state latency and DQN.replay per minibatch) and complete IntelligentSimulation episodes, and
+compares the operations per second against stored baselines.
+
+Everything runs on the CPU with fixed seeds, positions are taken from seeded random playouts and every timed operation
+is warmed up first, so runs on the same machine are comparable. Timings of different machines aren't, baselines should
+be updated on the machine the benchmark is run on.
+
+Usage:
+    python -m rl_chess.benchmark.TrainingBenchmark
+    python -m rl_chess.benchmark.TrainingBenchmark --benchmarks get_state step --output results.json
+    python -m rl_chess.benchmark.TrainingBenchmark --threshold replay=0.3 --tolerance 0.2
+    python -m rl_chess.benchmark.TrainingBenchmark --update-baselines
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+
+# hide any GPU before TensorFlow is imported, the baselines are CPU timings
+os.environ.setdefault("CUDA_VISIBLE_DEVICES", "-1")
+
+import numpy as np
+import tensorflow as tf
+
+from rl_chess.benchmark.PerftBenchmark import PerftBenchmark
+from rl_chess.domain.board.ChessBoard import ChessBoard
+from rl_chess.service.ActionCodec import ActionCodec
+from rl_chess.service.AgentService import AgentService
+from rl_chess.service.DQN import DQN
+from rl_chess.service.RandomPlayoutService import RandomPlayoutService
+from rl_chess.simulation.IntelligentSimulation import IntelligentSimulation
+
+DEFAULT_BASELINES_PATH = os.path.join(os.path.dirname(__file__), "baselines", "training.json")
+
+BENCHMARKS = ("get_state", "is_action_legal", "step", "act", "replay", "episodes")
+
+
+class TrainingBenchmark:
+
+    def __init__(self, seed: int = 0, position_count: int = 200, episodes: int = 2, max_plies: int = 100,
+                 batch_size: int = 32):
+        """
+        :param position_count: number of positions the environment and model are timed on
+        :param episodes: number of IntelligentSimulation episodes timed end to end
+        :param max_plies: moves after which an episode is cut off
+        """
+        self.seed = seed
+        self.position_count = position_count
+        self.episodes = episodes
+        self.max_plies = max_plies
+        self.batch_size = batch_size
+        self.agent_service = AgentService()
+        self.chess_board = ChessBoard()
+        self.positions = None
+        self.dqn_agent = None
+
+    def set_seeds(self) -> None:
+        # seeds Python's random, NumPy and TensorFlow
+        tf.keras.utils.set_random_seed(self.seed)
+
+    def get_positions(self) -> [str]:
+        """
+        Returns position_count positions as FEN, every fourth position of seeded random games from the starting
+        position.
+        """
+        if self.positions is None:
+            random_playout_service = RandomPlayoutService(seed=self.seed)
+            chess_board = ChessBoard()
+            self.positions = []
+            while len(self.positions) < self.position_count:
+                chess_board.reset()
+                _, moves = random_playout_service.play_game(chess_board, max_plies=200, restore=True)
+                for ply, move in enumerate(moves):
+                    PerftBenchmark.make_move(chess_board, move)
+                    if ply % 4 == 3:
+                        self.positions.append(chess_board.get_fen())
+            self.positions = self.positions[:self.position_count]
+        return self.positions
+
+    def get_dqn_agent(self) -> DQN:
+        if self.dqn_agent is None:
+            self.set_seeds()
+            self.dqn_agent = DQN(AgentService.STATE_SIZE, AgentService.ACTION_SIZE)
+        return self.dqn_agent
+
+    def load_position(self, fen: str) -> None:
+        self.chess_board.load_fen(fen)
+        self.agent_service.color_turn = self.chess_board.side_to_move
+
+    @staticmethod
+    def get_result(operations: int, seconds: float) -> {}:
+        return {
+            "operations": operations,
+            "seconds": seconds,
+            "operations_per_second": operations / seconds if seconds > 0 else 0.0,
+            "mean_ms": seconds * 1e3 / operations if operations > 0 else 0.0
+        }
+
+    def time_get_state(self, repeats: int = 50) -> {}:
+        seconds = 0.0
+        for fen in self.get_positions():
+            self.load_position(fen)
+            start_time = time.perf_counter()
+            for _ in range(repeats):
+                self.agent_service.get_state(self.chess_board)
+            seconds += time.perf_counter() - start_time
+        return self.get_result(repeats * len(self.get_positions()), seconds)
+
+    def time_is_action_legal(self, actions_per_position: int = 50) -> {}:
+        """
+        Times a mix of legal and random actions per position. The legal move cache is cleared for every position, so
+        the first call generates the legal moves and the others hit the cache, as during training.
+        """
+        self.set_seeds()
+        legal_move_cache = self.agent_service.piece_movement_service.legal_move_cache
+        seconds = 0.0
+        operations = 0
+        for fen in self.get_positions():
+            self.load_position(fen)
+            legal_actions = self.agent_service.get_legal_actions(self.chess_board)
+            actions = np.random.randint(ActionCodec.ACTION_SIZE, size=actions_per_position)
+            if len(legal_actions):
+                actions[::2] = np.random.choice(legal_actions, size=len(actions[::2]))
+            actions = actions.tolist()
+            state = self.agent_service.get_state(self.chess_board)
+            legal_move_cache.clear()
+
+            start_time = time.perf_counter()
+            for action in actions:
+                self.agent_service.is_action_legal(self.chess_board, state, action)
+            seconds += time.perf_counter() - start_time
+            operations += len(actions)
+        return self.get_result(operations, seconds)
+
+    def time_step(self, steps: int = 2000) -> {}:
+        """
+        Times steps with random legal actions through seeded games, starting a new game whenever one ends.
+        """
+        self.set_seeds()
+        seconds = 0.0
+        self.agent_service.reset(self.chess_board)
+        for _ in range(steps):
+            legal_actions = self.agent_service.get_legal_actions(self.chess_board)
+            action = int(np.random.choice(legal_actions))
+            start_time = time.perf_counter()
+            _, _, done = self.agent_service.step(self.chess_board, action)
+            seconds += time.perf_counter() - start_time
+            if done:
+                self.agent_service.reset(self.chess_board)
+        return self.get_result(steps, seconds)
+
+    def time_act(self, calls: int = 50, warm_up_calls: int = 3) -> {}:
+        """
+        Times DQN.act on single states with exploration off, so every call runs the model.
+        """
+        dqn_agent = self.get_dqn_agent()
+        dqn_agent.epsilon = 0.0
+        inputs = []
+        for fen in self.get_positions()[:calls]:
+            self.load_position(fen)
+            inputs.append((self.agent_service.get_state(self.chess_board),
+                           self.agent_service.get_legal_action_mask(self.chess_board)))
+
+        for state, legal_action_mask in inputs[:warm_up_calls]:
+            dqn_agent.act(state, legal_action_mask)
+        start_time = time.perf_counter()
+        for state, legal_action_mask in inputs:
+            dqn_agent.act(state, legal_action_mask)
+        return self.get_result(len(inputs), time.perf_counter() - start_time)
+
+    def time_replay(self, minibatches: int = 20, warm_up_minibatches: int = 2) -> {}:
+        """
+        Times DQN.replay per minibatch of batch_size, on a memory filled with transitions between the positions.
+        """
+        dqn_agent = self.get_dqn_agent()
+        self.set_seeds()
+        if len(dqn_agent.memory) <= self.batch_size:
+            previous = None
+            for fen in self.get_positions():
+                self.load_position(fen)
+                current = (self.agent_service.get_state(self.chess_board),
+                           self.agent_service.get_legal_action_mask(self.chess_board))
+                if previous is not None:
+                    action = int(np.random.choice(np.flatnonzero(previous[1]))) if previous[1].any() else 0
+                    dqn_agent.remember(previous[0], action, -0.01, current[0], False, current[1])
+                previous = current
+
+        for _ in range(warm_up_minibatches):
+            dqn_agent.replay(self.batch_size)
+        start_time = time.perf_counter()
+        for _ in range(minibatches):
+            dqn_agent.replay(self.batch_size)
+        return self.get_result(minibatches, time.perf_counter() - start_time)
+
+    def time_episodes(self) -> {}:
+        """
+        Times complete IntelligentSimulation episodes, including replays and checkpoint saves, as environment steps.
+        """
+        self.set_seeds()
+        with tempfile.TemporaryDirectory() as weights_dir, contextlib.redirect_stdout(io.StringIO()):
+            start_time = time.perf_counter()
+            steps = IntelligentSimulation.run(episodes=self.episodes, max_plies=self.max_plies,
+                                              weights_path=os.path.join(weights_dir, "benchmark.weights.h5"))
+            seconds = time.perf_counter() - start_time
+        return self.get_result(steps, seconds)
+
+    def run(self, benchmark_name: str) -> {}:
+        return getattr(self, f"time_{benchmark_name}")()
+
+    @staticmethod
+    def get_tolerance(benchmark_name: str, baselines: {}, thresholds: {str: float}, default_tolerance: float) -> float:
+        """
+        Returns the accepted slowdown of a benchmark: from thresholds if given there, else from its baseline, else the
+        default.
+        """
+        if benchmark_name in thresholds:
+            return thresholds[benchmark_name]
+        return baselines.get(benchmark_name, {}).get("tolerance", default_tolerance)
+
+    @staticmethod
+    def compare_with_baselines(benchmark_name: str, result: {}, baselines: {}, tolerance: float) -> [str]:
+        """
+        :param tolerance: accepted slowdown as a fraction of the baseline operations per second, e.g. 0.5 for 50%
+        :return: description of the regression if one was found
+        """
+        baseline_speed = baselines.get(benchmark_name, {}).get("operations_per_second")
+        if baseline_speed is not None and result["operations_per_second"] < baseline_speed * (1 - tolerance):
+            return [f"{benchmark_name}: {result['operations_per_second']:,.1f} operations/s is more than "
+                    f"{tolerance:.0%} below the baseline of {baseline_speed:,.1f}"]
+        return []
+
+    @staticmethod
+    def load_baselines(path: str) -> {}:
+        if not os.path.exists(path):
+            return {}
+        with open(path) as baselines_file:
+            return json.load(baselines_file)
+
+    @staticmethod
+    def save_json(path: str, content: {}) -> None:
+        with open(path, "w") as json_file:
+            json.dump(content, json_file, indent=2, sort_keys=True)
+            json_file.write("\n")
+
+    @staticmethod
+    def update_baselines(benchmark_name: str, result: {}, baselines: {}) -> None:
+        # a tolerance set in the file for the benchmark is kept
+        baseline = baselines.setdefault(benchmark_name, {})
+        baseline["operations_per_second"] = round(result["operations_per_second"], 1)
+
+
+def parse_thresholds(thresholds: [str]) -> {str: float}:
+    parsed_thresholds = {}
+    for threshold in thresholds:
+        benchmark_name, _, tolerance = threshold.partition("=")
+        if benchmark_name not in BENCHMARKS or not tolerance:
+            raise argparse.ArgumentTypeError(f"Expected BENCHMARK=FRACTION with a benchmark out of "
+                                             f"{', '.join(BENCHMARKS)}, got '{threshold}'")
+        parsed_thresholds[benchmark_name] = float(tolerance)
+    return parsed_thresholds
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Time the environment, the model and complete training episodes.")
+    parser.add_argument("--benchmarks", nargs="+", choices=BENCHMARKS, default=list(BENCHMARKS))
+    parser.add_argument("--seed", type=int, default=0, help="seed of every random number generator (default: 0)")
+    parser.add_argument("--positions", type=int, default=200, help="number of positions to time on (default: 200)")
+    parser.add_argument("--episodes", type=int, default=2, help="number of episodes to time (default: 2)")
+    parser.add_argument("--max-plies", type=int, default=100, help="moves per episode at most (default: 100)")
+    parser.add_argument("--output", help="JSON file to write the results to")
+    parser.add_argument("--baselines", default=DEFAULT_BASELINES_PATH, help="JSON file with baseline speeds")
+    parser.add_argument("--update-baselines", action="store_true", help="store this run's results as the baselines")
+    parser.add_argument("--tolerance", type=float, default=0.5,
+                        help="accepted slowdown against a baseline without its own tolerance (default: 0.5)")
+    parser.add_argument("--threshold", nargs="+", default=[], metavar="BENCHMARK=FRACTION",
+                        help="accepted slowdown of single benchmarks, overriding the baselines and --tolerance")
+    args = parser.parse_args(argv)
+    try:
+        thresholds = parse_thresholds(args.threshold)
+    except argparse.ArgumentTypeError as error:
+        parser.error(str(error))
+
+    training_benchmark = TrainingBenchmark(args.seed, args.positions, args.episodes, args.max_plies)
+    baselines = TrainingBenchmark.load_baselines(args.baselines)
+    results = {}
+    regressions = []
+
+    for benchmark_name in args.benchmarks:
+        result = training_benchmark.run(benchmark_name)
+        results[benchmark_name] = result
+        print(f"{benchmark_name:<16}{result['operations']:>8} operations in {result['seconds']:8.3f}s "
+              f"({result['operations_per_second']:,.1f}/s, {result['mean_ms']:.3f} ms each)")
+
+        if args.update_baselines:
+            TrainingBenchmark.update_baselines(benchmark_name, result, baselines)
+        else:
+            tolerance = TrainingBenchmark.get_tolerance(benchmark_name, baselines, thresholds, args.tolerance)
+            regressions += TrainingBenchmark.compare_with_baselines(benchmark_name, result, baselines, tolerance)
+
+    if args.output:
+        TrainingBenchmark.save_json(args.output, {
+            "settings": {"seed": args.seed, "positions": args.positions, "episodes": args.episodes,
+                         "max_plies": args.max_plies},
+            "environment": {"python": platform.python_version(), "tensorflow": tf.__version__,
+                            "machine": platform.machine(), "system": platform.system()},
+            "results": results,
+            "regressions": regressions
+        })
+        print(f"Results written to {args.output}")
+    if args.update_baselines:
+        TrainingBenchmark.save_json(args.baselines, baselines)
+        print(f"Baselines written to {args.baselines}")
+
+    for regression in regressions:
+        print(f"REGRESSION: {regression}")
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,147 @@
+"""
+Move and attack tables built once at import time.
+
+Tiles are numbered row by row (square = pos_y * 8 + pos_x), matching ChessBoard.grid and BitBoard. Every table is
+indexed by that square number and holds both the destination coordinates, for lookups against the Tile grid, and the
+equivalent bit masks, for lookups against a BitBoard.
+"""
+from rl_chess.enums.Enums import MoveDirection
+
+SLIDING_DIRECTION_DELTAS = {
+    MoveDirection.UP: (-1, 0),
+    MoveDirection.DOWN: (1, 0),
+    MoveDirection.LEFT: (0, -1),
+    MoveDirection.RIGHT: (0, 1),
+    MoveDirection.UP_LEFT: (-1, -1),
+    MoveDirection.UP_RIGHT: (-1, 1),
+    MoveDirection.DOWN_LEFT: (1, -1),
+    MoveDirection.DOWN_RIGHT: (1, 1),
+}
+
+KNIGHT_DIRECTION_DELTAS = {
+    MoveDirection.ONE_O_CLOCK: (-2, 1),
+    MoveDirection.TWO_O_CLOCK: (-1, 2),
+    MoveDirection.FOUR_O_CLOCK: (1, 2),
+    MoveDirection.FIVE_O_CLOCK: (2, 1),
+    MoveDirection.SEVEN_O_CLOCK: (2, -1),
+    MoveDirection.EIGHT_O_CLOCK: (1, -2),
+    MoveDirection.TEN_O_CLOCK: (-1, -2),
+    MoveDirection.ELEVEN_O_CLOCK: (-2, -1),
+}
+
+ORTHOGONAL_DIRECTIONS = (MoveDirection.UP, MoveDirection.DOWN, MoveDirection.LEFT, MoveDirection.RIGHT)
+DIAGONAL_DIRECTIONS = (MoveDirection.UP_LEFT, MoveDirection.UP_RIGHT, MoveDirection.DOWN_LEFT, MoveDirection.DOWN_RIGHT)
+
+# rays that run towards higher square numbers, their nearest blocker is the least significant bit of the ray mask
+INCREASING_DIRECTIONS = (MoveDirection.DOWN, MoveDirection.RIGHT, MoveDirection.DOWN_LEFT, MoveDirection.DOWN_RIGHT)
+
+
+def get_square_index(pos_y: int, pos_x: int) -> int:
+    return pos_y * 8 + pos_x
+
+
+def get_square_coords(square: int) -> (int, int):
+    return square >> 3, square & 7
+
+
+def iterate_squares(mask: int):
+    """
+    Yields the index of every set bit in the given mask, from the least significant bit upwards.
+    """
+    while mask:
+        least_significant_bit = mask & -mask
+        yield least_significant_bit.bit_length() - 1
+        mask ^= least_significant_bit
+
+
+def get_coords_mask(coords: ((int, int),)) -> int:
+    mask = 0
+    for pos_y, pos_x in coords:
+        mask |= 1 << get_square_index(pos_y, pos_x)
+    return mask
+
+
+def build_ray(pos_y: int, pos_x: int, delta_y: int, delta_x: int) -> ((int, int),):
+    ray = []
+    pos_y += delta_y
+    pos_x += delta_x
+    while 0 <= pos_y < 8 and 0 <= pos_x < 8:
+        ray.append((pos_y, pos_x))
+        pos_y += delta_y
+        pos_x += delta_x
+    return tuple(ray)
+
+
+def build_jump_targets(pos_y: int, pos_x: int, deltas: [(int, int)]) -> ((int, int),):
+    return tuple((pos_y + delta_y, pos_x + delta_x) for delta_y, delta_x in deltas
+                 if 0 <= pos_y + delta_y < 8 and 0 <= pos_x + delta_x < 8)
+
+
+def build_table(build_entry) -> tuple:
+    return tuple(build_entry(*get_square_coords(square)) for square in range(64))
+
+
+# RAYS[direction][square] lists the tiles reached by sliding in that direction, nearest tile first. Knight directions
+# are included as rays of length one so that every MoveDirection can be looked up the same way
+RAYS = {direction: build_table(lambda pos_y, pos_x, delta=delta: build_ray(pos_y, pos_x, *delta))
+        for direction, delta in SLIDING_DIRECTION_DELTAS.items()}
+RAYS.update({direction: build_table(lambda pos_y, pos_x, delta=delta: build_jump_targets(pos_y, pos_x, [delta]))
+             for direction, delta in KNIGHT_DIRECTION_DELTAS.items()})
+RAY_MASKS = {direction: tuple(get_coords_mask(ray) for ray in rays) for direction, rays in RAYS.items()}
+
+ORTHOGONAL_RAYS = build_table(lambda pos_y, pos_x: tuple(RAYS[direction][get_square_index(pos_y, pos_x)]
+                                                         for direction in ORTHOGONAL_DIRECTIONS))
+DIAGONAL_RAYS = build_table(lambda pos_y, pos_x: tuple(RAYS[direction][get_square_index(pos_y, pos_x)]
+                                                       for direction in DIAGONAL_DIRECTIONS))
+
+KNIGHT_TARGETS = build_table(lambda pos_y, pos_x: build_jump_targets(pos_y, pos_x, KNIGHT_DIRECTION_DELTAS.values()))
+KNIGHT_ATTACKS = tuple(get_coords_mask(targets) for targets in KNIGHT_TARGETS)
+
+KING_TARGETS = build_table(lambda pos_y, pos_x: build_jump_targets(pos_y, pos_x, SLIDING_DIRECTION_DELTAS.values()))
+KING_ATTACKS = tuple(get_coords_mask(targets) for targets in KING_TARGETS)
+
+# PAWN_TARGETS[color_index][square] are the tiles attacked by a pawn of that color (0 for black, 1 for white). Read the
+# other way around, PAWN_TARGETS[color_index][square] are also the tiles from which an opposing pawn attacks square
+PAWN_TARGETS = (build_table(lambda pos_y, pos_x: build_jump_targets(pos_y, pos_x, [(1, -1), (1, 1)])),
+                build_table(lambda pos_y, pos_x: build_jump_targets(pos_y, pos_x, [(-1, -1), (-1, 1)])))
+PAWN_ATTACKS = tuple(tuple(get_coords_mask(targets) for targets in color_targets) for color_targets in PAWN_TARGETS)
+
+# The same tables by square number, for boards that track attacks per square, see ChessBoard.attack_counts.
+# SQUARE_RAYS[square][ray_index] follows SLIDING_RAY_DIRECTIONS, orthogonal rays first, and OPPOSITE_RAY_INDICES maps
+# every ray index to the one running the other way
+SLIDING_RAY_DIRECTIONS = ORTHOGONAL_DIRECTIONS + DIAGONAL_DIRECTIONS
+ORTHOGONAL_RAY_INDICES = (0, 1, 2, 3)
+DIAGONAL_RAY_INDICES = (4, 5, 6, 7)
+OPPOSITE_RAY_INDICES = tuple(SLIDING_RAY_DIRECTIONS.index(direction) for direction in (
+    MoveDirection.DOWN, MoveDirection.UP, MoveDirection.RIGHT, MoveDirection.LEFT, MoveDirection.DOWN_RIGHT,
+    MoveDirection.DOWN_LEFT, MoveDirection.UP_RIGHT, MoveDirection.UP_LEFT))
+SQUARE_RAYS = tuple(tuple(tuple(get_square_index(pos_y, pos_x) for pos_y, pos_x in RAYS[direction][square])
+                          for direction in SLIDING_RAY_DIRECTIONS) for square in range(64))
+
+# (pos_y, pos_x) of every square, to turn the set bits of a mask back into tiles
+SQUARE_COORDS = tuple(get_square_coords(square) for square in range(64))
+
+# SQUARE_RAY_MASKS[square][ray_index] are the same rays as bit masks, RAY_INCREASES[ray_index] tells whether the ray
+# runs towards higher square numbers, and ORTHOGONAL_REACH and DIAGONAL_REACH combine the rays of each kind from a square
+SQUARE_RAY_MASKS = tuple(tuple(RAY_MASKS[direction][square] for direction in SLIDING_RAY_DIRECTIONS)
+                         for square in range(64))
+RAY_INCREASES = tuple(direction in INCREASING_DIRECTIONS for direction in SLIDING_RAY_DIRECTIONS)
+ORTHOGONAL_REACH = tuple(RAY_MASKS[MoveDirection.UP][square] | RAY_MASKS[MoveDirection.DOWN][square]
+                         | RAY_MASKS[MoveDirection.LEFT][square] | RAY_MASKS[MoveDirection.RIGHT][square]
+                         for square in range(64))
+DIAGONAL_REACH = tuple(RAY_MASKS[MoveDirection.UP_LEFT][square] | RAY_MASKS[MoveDirection.UP_RIGHT][square]
+                       | RAY_MASKS[MoveDirection.DOWN_LEFT][square] | RAY_MASKS[MoveDirection.DOWN_RIGHT][square]
+                       for square in range(64))
+
+# RAY_INDEX_BETWEEN[square][other_square] is the index of the ray from square that reaches other_square, or -1 if the
+# two tiles aren't on a common line
+RAY_INDEX_BETWEEN = tuple(tuple(next((ray_index for ray_index, ray in enumerate(SQUARE_RAYS[square])
+                                      if other_square in ray), -1) for other_square in range(64))
+                          for square in range(64))
+
+KNIGHT_TARGET_SQUARES = tuple(tuple(get_square_index(pos_y, pos_x) for pos_y, pos_x in targets)
+                              for targets in KNIGHT_TARGETS)
+KING_TARGET_SQUARES = tuple(tuple(get_square_index(pos_y, pos_x) for pos_y, pos_x in targets)
+                            for targets in KING_TARGETS)
+PAWN_TARGET_SQUARES = tuple(tuple(tuple(get_square_index(pos_y, pos_x) for pos_y, pos_x in targets)
+                                  for targets in color_targets) for color_targets in PAWN_TARGETS)
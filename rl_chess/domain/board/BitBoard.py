@@ -0,0 +1,206 @@
+from rl_chess.domain.board.AttackTables import get_square_index, KNIGHT_ATTACKS, KING_ATTACKS, PAWN_ATTACKS, \
+    RAY_INDEX_BETWEEN, SQUARE_RAY_MASKS, RAY_INCREASES, ORTHOGONAL_RAY_INDICES, DIAGONAL_RAY_INDICES, \
+    ORTHOGONAL_REACH, DIAGONAL_REACH, SQUARE_COORDS
+from rl_chess.domain.board.ChessBoard import ChessBoard, SLIDING_RAY_INDICES
+from rl_chess.domain.pieces.Piece import Piece
+from rl_chess.enums.Enums import Color, MoveDirection, PieceType
+
+KING_TYPE = PieceType.KING.value
+QUEEN_TYPE = PieceType.QUEEN.value
+BISHOP_TYPE = PieceType.BISHOP.value
+KNIGHT_TYPE = PieceType.KNIGHT.value
+ROOK_TYPE = PieceType.ROOK.value
+PAWN_TYPE = PieceType.PAWN.value
+
+
+class BitBoard(ChessBoard):
+    """
+    ChessBoard that additionally keeps the position as bitboards: one 64-bit integer per piece type and color, plus
+    an occupancy mask per color and one for the whole board. Bit n represents the tile (n // 8, n % 8), i.e. tiles
+    are numbered row by row in the same order as ChessBoard.grid.
+
+    The Tile grid is still kept so BitBoard can be used anywhere a ChessBoard is expected, but occupancy tests, move
+    generation and the check, threat and pin tests are answered from the masks. Instead of ChessBoard's incremental
+    attack counts, which would have to be retraced on every placement and lift, attacks are traced when asked for with
+    is_square_attacked. attack_counts is None, get_attack_count counts from scratch.
+    """
+
+    def __init__(self):
+        # indexed as [color_index][type_code], where color_index is 0 for black and 1 for white
+        self.piece_bitboards = [[0] * (len(PieceType) + 1), [0] * (len(PieceType) + 1)]
+        self.color_occupancy = [0, 0]
+        self.occupied = 0
+        super().__init__()
+        self.attack_counts = None
+
+    def _place_occupant(self, occupant: Piece, pos_y: int, pos_x: int) -> None:
+        super()._place_occupant(occupant, pos_y, pos_x)
+        bit = 1 << get_square_index(pos_y, pos_x)
+        color_index = occupant.color_code
+        self.piece_bitboards[color_index][occupant.type_code] |= bit
+        self.color_occupancy[color_index] |= bit
+        self.occupied |= bit
+
+    def _lift_occupant(self, pos_y: int, pos_x: int) -> Piece:
+        occupant = super()._lift_occupant(pos_y, pos_x)
+        if occupant is not None:
+            bit = 1 << get_square_index(pos_y, pos_x)
+            color_index = occupant.color_code
+            self.piece_bitboards[color_index][occupant.type_code] &= ~bit
+            self.color_occupancy[color_index] &= ~bit
+            self.occupied &= ~bit
+        return occupant
+
+    def _update_attacks(self, occupant: Piece, square: int, delta: int) -> None:
+        pass
+
+    def _update_blocked_attacks(self, square: int, delta: int) -> None:
+        pass
+
+    def get_attack_count(self, pos_y: int, pos_x: int, attacking_color: Color) -> int:
+        return self.compute_attack_counts()[self.get_color_index(attacking_color)][get_square_index(pos_y, pos_x)]
+
+    def is_king_in_check(self, color_index: int) -> bool:
+        king = self.kings[color_index]
+        return king is not None and self.is_square_index_attacked(king.coords[0] * 8 + king.coords[1], 1 - color_index)
+
+    def is_square_threatened(self, piece: Piece, square: int) -> bool:
+        return self.is_square_index_attacked(square, 1 - piece.color_code, 1 << (piece.coords[0] * 8 + piece.coords[1]))
+
+    def can_expose_own_king(self, piece: Piece) -> bool:
+        """
+        Unlike ChessBoard's test, which only knows the piece may be pinned, this one is exact: the King is in check or
+        the piece is pinned.
+        """
+        king = self.kings[piece.color_code]
+        if king is None:
+            return False
+        king_square = king.coords[0] * 8 + king.coords[1]
+        return self.is_pinned(piece.coords[0] * 8 + piece.coords[1], king_square) \
+            or self.is_square_index_attacked(king_square, 1 - piece.color_code)
+
+    def get_piece_destinations(self, piece: Piece, move_directions: [MoveDirection] = None,
+                               move_range: int = None) -> [(int, int)]:
+        """
+        Generates the destinations from the attack and ray masks, for the piece's own directions and range. Other
+        directions or ranges fall back to ChessBoard's tile by tile generation.
+        """
+        if (move_directions is not None and move_directions is not piece.move_directions) \
+                or (move_range is not None and move_range != piece.move_range):
+            return super().get_piece_destinations(piece, move_directions, move_range)
+
+        color_index = piece.color_code
+        square = piece.coords[0] * 8 + piece.coords[1]
+        occupied = self.occupied
+        type_code = piece.type_code
+
+        if type_code == PAWN_TYPE:
+            targets = PAWN_ATTACKS[color_index][square] & self.color_occupancy[1 - color_index]
+            forward_square = square - 8 if color_index else square + 8
+            if 0 <= forward_square < 64 and not (occupied >> forward_square) & 1:
+                targets |= 1 << forward_square
+                # from the starting row the tile two steps ahead is always on the board
+                double_forward_square = square - 16 if color_index else square + 16
+                if square >> 3 == (6 if color_index else 1) and not (occupied >> double_forward_square) & 1:
+                    targets |= 1 << double_forward_square
+        elif type_code == KNIGHT_TYPE:
+            targets = KNIGHT_ATTACKS[square] & ~self.color_occupancy[color_index]
+        elif type_code == KING_TYPE:
+            targets = KING_ATTACKS[square] & ~self.color_occupancy[color_index]
+        else:
+            targets = 0
+            rays = SQUARE_RAY_MASKS[square]
+            for ray_index in SLIDING_RAY_INDICES[type_code]:
+                ray = rays[ray_index]
+                blockers = ray & occupied
+                if blockers:
+                    # cut the ray off behind its nearest blocker, the blocker itself stays reachable
+                    if RAY_INCREASES[ray_index]:
+                        blocker_square = (blockers & -blockers).bit_length() - 1
+                    else:
+                        blocker_square = blockers.bit_length() - 1
+                    ray ^= SQUARE_RAY_MASKS[blocker_square][ray_index]
+                targets |= ray
+            targets &= ~self.color_occupancy[color_index]
+
+        destinations = []
+        while targets:
+            least_significant_bit = targets & -targets
+            destinations.append(SQUARE_COORDS[least_significant_bit.bit_length() - 1])
+            targets ^= least_significant_bit
+        return destinations
+
+    def is_tile_occupied(self, pos_y: int, pos_x: int) -> bool:
+        return (self.occupied >> (pos_y * 8 + pos_x)) & 1 == 1
+
+    def is_tile_occupied_by_color(self, pos_y: int, pos_x: int, color: Color) -> bool:
+        return (self.color_occupancy[self.get_color_index(color)] >> get_square_index(pos_y, pos_x)) & 1 == 1
+
+    def get_piece_bitboard(self, piece_type: PieceType, color: Color) -> int:
+        return self.piece_bitboards[self.get_color_index(color)][piece_type]
+
+    def get_color_occupancy(self, color: Color) -> int:
+        return self.color_occupancy[self.get_color_index(color)]
+
+    def get_empty_squares(self) -> int:
+        return ~self.occupied & 0xFFFFFFFFFFFFFFFF
+
+    def is_square_attacked(self, pos_y: int, pos_x: int, attacking_color: Color, ignored_mask: int = 0) -> bool:
+        """
+        Checks if any piece of the attacking color attacks the given tile, using whole-board mask operations only.
+        :param ignored_mask: tiles treated as empty when tracing sliding attacks, e.g. the King that is moving away
+        """
+        return self.is_square_index_attacked(get_square_index(pos_y, pos_x), self.get_color_index(attacking_color),
+                                             ignored_mask)
+
+    def is_square_index_attacked(self, square: int, attacking_color_index: int, ignored_mask: int = 0) -> bool:
+        """
+        is_square_attacked by square number and color_index, for callers that already have both.
+        """
+        attackers = self.piece_bitboards[attacking_color_index]
+
+        if KNIGHT_ATTACKS[square] & attackers[KNIGHT_TYPE] \
+                or KING_ATTACKS[square] & attackers[KING_TYPE] \
+                or PAWN_ATTACKS[1 - attacking_color_index][square] & attackers[PAWN_TYPE]:
+            return True
+
+        occupied = self.occupied & ~ignored_mask
+        rays = SQUARE_RAY_MASKS[square]
+        # only sliders standing on one of the square's lines are traced
+        orthogonal_sliders = (attackers[ROOK_TYPE] | attackers[QUEEN_TYPE]) & ORTHOGONAL_REACH[square]
+        diagonal_sliders = (attackers[BISHOP_TYPE] | attackers[QUEEN_TYPE]) & DIAGONAL_REACH[square]
+        for ray_indices, sliders in ((ORTHOGONAL_RAY_INDICES, orthogonal_sliders),
+                                     (DIAGONAL_RAY_INDICES, diagonal_sliders)):
+            if not sliders:
+                continue
+            for ray_index in ray_indices:
+                blockers = rays[ray_index] & occupied
+                if blockers:
+                    if RAY_INCREASES[ray_index]:
+                        nearest_blocker = blockers & -blockers
+                    else:
+                        nearest_blocker = 1 << (blockers.bit_length() - 1)
+                    if nearest_blocker & sliders:
+                        return True
+        return False
+
+    def is_pinned(self, square: int, king_square: int) -> bool:
+        """
+        Checks if the occupant of square shields its King on king_square from an opposing slider on their common line,
+        i.e. if lifting it would put the King in check along that line.
+        """
+        ray_index = RAY_INDEX_BETWEEN[king_square][square]
+        if ray_index < 0:
+            return False
+
+        blockers = SQUARE_RAY_MASKS[king_square][ray_index] & self.occupied & ~(1 << square)
+        if not blockers:
+            return False
+        if RAY_INCREASES[ray_index]:
+            nearest_blocker = blockers & -blockers
+        else:
+            nearest_blocker = 1 << (blockers.bit_length() - 1)
+
+        attackers = self.piece_bitboards[1 - self.occupants[king_square].color_code]
+        slider_type = ROOK_TYPE if ray_index in ORTHOGONAL_RAY_INDICES else BISHOP_TYPE
+        return nearest_blocker & (attackers[slider_type] | attackers[QUEEN_TYPE]) != 0
@@ -1,4 +1,7 @@
+from rl_chess.domain.board.AttackTables import RAYS, SQUARE_RAYS, OPPOSITE_RAY_INDICES, ORTHOGONAL_RAY_INDICES, \
+    DIAGONAL_RAY_INDICES, KNIGHT_TARGET_SQUARES, KING_TARGET_SQUARES, PAWN_TARGET_SQUARES, RAY_INDEX_BETWEEN
 from rl_chess.domain.board.Tile import Tile
+from rl_chess.domain.board.Zobrist import PIECE_KEYS, SIDE_TO_MOVE_KEY
 from rl_chess.domain.pieces.Bishop import Bishop
 from rl_chess.domain.pieces.King import King
 from rl_chess.domain.pieces.Knight import Knight
@@ -6,9 +9,38 @@ from rl_chess.domain.pieces.Pawn import Pawn
 from rl_chess.domain.pieces.Piece import Piece
 from rl_chess.domain.pieces.Queen import Queen
 from rl_chess.domain.pieces.Rook import Rook
-from rl_chess.enums.Enums import Color
+from rl_chess.enums.Enums import Color, MoveDirection, PieceType
 import numpy as np
 
+PROMOTION_PIECES = {PieceType.QUEEN: Queen, PieceType.ROOK: Rook, PieceType.BISHOP: Bishop, PieceType.KNIGHT: Knight}
+
+STARTING_FEN = "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w - - 0 1"
+
+# FEN letters of the black pieces, white pieces use the upper case letter
+FEN_PIECES = {"k": King, "q": Queen, "b": Bishop, "n": Knight, "r": Rook, "p": Pawn}
+FEN_LETTERS = {10 * piece_class.type_code + color_index: letter.upper() if color_index else letter
+               for letter, piece_class in FEN_PIECES.items() for color_index in (0, 1)}
+SHORT_NAME_PREFIXES = {PieceType.KING: "Ki", PieceType.QUEEN: "Qu", PieceType.BISHOP: "Bi", PieceType.KNIGHT: "Kn",
+                       PieceType.ROOK: "Ro", PieceType.PAWN: "Pa"}
+
+# SLIDING_RAY_INDICES[type_code] are the rays, see AttackTables.SQUARE_RAYS, a piece type slides along and
+# SLIDES_ALONG[type_code][ray_index] tells whether it slides along a ray. The squares the other types attack are looked
+# up as JUMP_TARGET_SQUARES[color_index][type_code][square]
+SLIDING_RAY_INDICES = tuple({PieceType.QUEEN: ORTHOGONAL_RAY_INDICES + DIAGONAL_RAY_INDICES,
+                             PieceType.BISHOP: DIAGONAL_RAY_INDICES,
+                             PieceType.ROOK: ORTHOGONAL_RAY_INDICES}.get(type_code, ())
+                            for type_code in range(len(PieceType) + 1))
+SLIDES_ALONG = tuple(tuple(ray_index in ray_indices for ray_index in range(8)) for ray_indices in SLIDING_RAY_INDICES)
+JUMP_TARGET_SQUARES = tuple(tuple({PieceType.KING: KING_TARGET_SQUARES,
+                                   PieceType.KNIGHT: KNIGHT_TARGET_SQUARES,
+                                   PieceType.PAWN: PAWN_TARGET_SQUARES[color_index]}.get(type_code)
+                                  for type_code in range(len(PieceType) + 1)) for color_index in (0, 1))
+
+# layout of the records kept on the undo stack by make_move
+UNDO_PIECE, UNDO_POS_Y, UNDO_POS_X, UNDO_DESTINATION_Y, UNDO_DESTINATION_X, UNDO_CAPTURED, UNDO_PROMOTED, \
+    UNDO_ZOBRIST_HASH, UNDO_HALFMOVE_CLOCK = range(9)
+UNDO_RECORD_SIZE = 9
+
 
 class ChessBoard:
 
@@ -22,39 +54,270 @@ class ChessBoard:
                      [Tile(6, 0), Tile(6, 1), Tile(6, 2), Tile(6, 3), Tile(6, 4), Tile(6, 5), Tile(6, 6), Tile(6, 7)],
                      [Tile(7, 0), Tile(7, 1), Tile(7, 2), Tile(7, 3), Tile(7, 4), Tile(7, 5), Tile(7, 6), Tile(7, 7)]]
 
+        # every piece ever added to the board by piece_id, captured pieces stay in here with alive set to False
         self.white_pieces = {}
         self.black_pieces = {}
+
+        # pieces currently on the board, indexed by color_index (0 for black, 1 for white) and kept up to date by
+        # _place_occupant and _lift_occupant. The dicts are used as insertion-ordered sets
+        self.live_pieces = [{}, {}]
+        self.live_pieces_by_type = [[{} for _ in range(len(PieceType) + 1)], [{} for _ in range(len(PieceType) + 1)]]
+        self.kings = [None, None]
+
+        # int8 mirror of the grid by square (pos_y * 8 + pos_x) holding 10 * type_code + color_index for occupied tiles
+        # and 0 for empty ones, the tile encoding of AgentService.get_state
+        self.tile_codes = np.zeros(64, dtype=np.int8)
+
+        # occupants by square, and per color_index the number of that color's pieces attacking every square. A sliding
+        # attack reaches up to and including the first occupied tile, and pawns attack diagonally whether the tile is
+        # occupied or not. Both are kept up to date by the hooks, which only retrace the sliders whose rays run through
+        # the changed tile
+        self.occupants = [None] * 64
+        self.attack_counts = [[0] * 64, [0] * 64]
+
+        # hash of the pieces on the board and the side to move, see Zobrist
+        self.side_to_move = Color.WHITE
+        self.zobrist_hash = 0
+
+        # plies since the last capture or pawn move, and the number of moves made from every earlier position by hash,
+        # for the 50-move rule and repetitions. Both are kept by move_piece, make_move and unmake_move
+        self.halfmove_clock = 0
+        self.position_counts = {}
+
+        # undo records are reused between moves, undo_depth is the number of records currently in use
+        self.undo_stack = []
+        self.undo_depth = 0
         self.reset()
 
     def get_tile(self, pos_y: int, pos_x: int) -> Tile:
         return self.grid[pos_y][pos_x]
 
     def add_occupant(self, occupant: Piece) -> None:
-        self.grid[occupant.coords[0]][occupant.coords[1]].add_occupant(occupant)
-        if occupant.color == Color.WHITE:
-            self.white_pieces[occupant.get_id()] = occupant
+        pos_y, pos_x = occupant.coords
+        if self.is_tile_occupied(pos_y, pos_x):
+            self._lift_occupant(pos_y, pos_x)
+        self._place_occupant(occupant, pos_y, pos_x)
+        if occupant.color_code:
+            self.white_pieces[occupant.piece_id] = occupant
         else:
-            self.black_pieces[occupant.get_id()] = occupant
+            self.black_pieces[occupant.piece_id] = occupant
 
     def remove_occupant_from_tile(self, pos_y: int, pos_x: int) -> None:
-        self.get_tile(pos_y, pos_x).remove_occupant()
+        if self.is_tile_occupied(pos_y, pos_x):
+            self._lift_occupant(pos_y, pos_x)
+
+    @staticmethod
+    def get_color_index(color: Color) -> int:
+        return 1 if color == Color.WHITE else 0
+
+    def _place_occupant(self, occupant: Piece, pos_y: int, pos_x: int) -> None:
+        # Every change to the board's contents goes through this hook and _lift_occupant, so subclasses that keep
+        # derived representations of the position only need to override these two methods
+        self.grid[pos_y][pos_x].occupant = occupant
+
+        color_index = occupant.color_code
+        square = pos_y * 8 + pos_x
+        self.zobrist_hash ^= PIECE_KEYS[color_index][occupant.type_code][square]
+        self.tile_codes[square] = 10 * occupant.type_code + color_index
+        self.occupants[square] = occupant
+        self._update_blocked_attacks(square, -1)
+        self._update_attacks(occupant, square, 1)
+        self.live_pieces[color_index][occupant] = None
+        self.live_pieces_by_type[color_index][occupant.type_code][occupant] = None
+        if occupant.type_code == PieceType.KING:
+            self.kings[color_index] = occupant
+
+    def _lift_occupant(self, pos_y: int, pos_x: int) -> Piece:
+        tile = self.grid[pos_y][pos_x]
+        occupant = tile.occupant
+        tile.occupant = None
+
+        if occupant is not None:
+            color_index = occupant.color_code
+            square = pos_y * 8 + pos_x
+            self.zobrist_hash ^= PIECE_KEYS[color_index][occupant.type_code][square]
+            self.tile_codes[square] = 0
+            self.occupants[square] = None
+            self._update_attacks(occupant, square, -1)
+            self._update_blocked_attacks(square, 1)
+            del self.live_pieces[color_index][occupant]
+            del self.live_pieces_by_type[color_index][occupant.type_code][occupant]
+            if self.kings[color_index] is occupant:
+                self.kings[color_index] = None
+        return occupant
+
+    def _update_attacks(self, occupant: Piece, square: int, delta: int) -> None:
+        """
+        Adds delta to the attack count of every tile the occupant attacks from the given square.
+        """
+        attack_counts = self.attack_counts[occupant.color_code]
+        ray_indices = SLIDING_RAY_INDICES[occupant.type_code]
+        if ray_indices:
+            occupants = self.occupants
+            rays = SQUARE_RAYS[square]
+            for ray_index in ray_indices:
+                for target in rays[ray_index]:
+                    attack_counts[target] += delta
+                    if occupants[target] is not None:
+                        break
+        else:
+            for target in JUMP_TARGET_SQUARES[occupant.color_code][occupant.type_code][square]:
+                attack_counts[target] += delta
+
+    def _update_blocked_attacks(self, square: int, delta: int) -> None:
+        """
+        Adds delta to the attack count of every tile behind the given square as seen by the sliders attacking it, i.e.
+        -1 when an occupant is placed there and blocks their rays and 1 when it is lifted and frees them.
+        """
+        occupants = self.occupants
+        rays = SQUARE_RAYS[square]
+        for ray_index in range(8):
+            for source in rays[ray_index]:
+                slider = occupants[source]
+                if slider is None:
+                    continue
+                if SLIDES_ALONG[slider.type_code][ray_index]:
+                    attack_counts = self.attack_counts[slider.color_code]
+                    for target in rays[OPPOSITE_RAY_INDICES[ray_index]]:
+                        attack_counts[target] += delta
+                        if occupants[target] is not None:
+                            break
+                break
+
+    def get_attack_count(self, pos_y: int, pos_x: int, attacking_color: Color) -> int:
+        """
+        Returns the number of pieces of the attacking color that attack the given tile.
+        """
+        return self.attack_counts[self.get_color_index(attacking_color)][pos_y * 8 + pos_x]
+
+    def compute_attack_counts(self) -> [[int]]:
+        """
+        Computes the attack counts from scratch, they should always equal the incrementally updated attack_counts.
+        """
+        attack_counts = [[0] * 64, [0] * 64]
+        for color_index, pieces in enumerate(self.live_pieces):
+            for piece in pieces:
+                square = piece.coords[0] * 8 + piece.coords[1]
+                if not SLIDING_RAY_INDICES[piece.type_code]:
+                    for target in JUMP_TARGET_SQUARES[color_index][piece.type_code][square]:
+                        attack_counts[color_index][target] += 1
+                    continue
+                for ray_index in SLIDING_RAY_INDICES[piece.type_code]:
+                    for target in SQUARE_RAYS[square][ray_index]:
+                        attack_counts[color_index][target] += 1
+                        if self.grid[target // 8][target % 8].is_occupied():
+                            break
+        return attack_counts
+
+    def is_king_in_check(self, color_index: int) -> bool:
+        king = self.kings[color_index]
+        return king is not None and self.attack_counts[1 - color_index][king.coords[0] * 8 + king.coords[1]] > 0
+
+    def is_square_threatened(self, piece: Piece, square: int) -> bool:
+        """
+        Checks if any piece of the other color attacks the given square, with the given piece never blocking a sliding
+        attack, e.g. for a King stepping away from a Rook along its line.
+
+        The square's attacks are looked up in the attack counts, which do count the piece as a blocker, so only a
+        slider behind the piece on the line through the square needs to be traced.
+        """
+        attack_counts = self.attack_counts[1 - piece.color_code]
+        if attack_counts[square]:
+            return True
+
+        piece_square = piece.coords[0] * 8 + piece.coords[1]
+        ray_index = RAY_INDEX_BETWEEN[square][piece_square]
+        if ray_index < 0 or not attack_counts[piece_square] or self.occupants[piece_square] is not piece:
+            return False
+
+        occupants = self.occupants
+        for source in SQUARE_RAYS[square][ray_index]:
+            if occupants[source] is not None:
+                if occupants[source] is not piece:
+                    return False  # the square is shielded from the piece's line by another occupant
+                break
+        for source in SQUARE_RAYS[piece_square][ray_index]:
+            occupant = occupants[source]
+            if occupant is not None:
+                return occupant.color_code != piece.color_code and SLIDES_ALONG[occupant.type_code][ray_index]
+        return False
+
+    def can_expose_own_king(self, piece: Piece) -> bool:
+        """
+        Checks whether moving the piece, other than the King, could leave its own King in check. Unless the King already
+        is in check, this needs the piece to stand on a line from the King on a square an opposing piece attacks, i.e.
+        to possibly be pinned.
+        """
+        king = self.kings[piece.color_code]
+        if king is None:
+            return False
+        attack_counts = self.attack_counts[1 - piece.color_code]
+        king_square = king.coords[0] * 8 + king.coords[1]
+        piece_square = piece.coords[0] * 8 + piece.coords[1]
+        return attack_counts[king_square] > 0 \
+            or (attack_counts[piece_square] > 0 and RAY_INDEX_BETWEEN[king_square][piece_square] >= 0)
+
+    def get_piece_destinations(self, piece: Piece, move_directions: [MoveDirection] = None,
+                               move_range: int = None) -> [(int, int)]:
+        """
+        Returns the tiles the piece can move to, without checking whether the move leaves its own King in check.
+        :param move_directions: directions to move in, the piece's own if None. Pawns always use their own
+        :param move_range: maximum number of tiles to move, the piece's own if None
+        """
+        occupants = self.occupants
+        pos_y, pos_x = piece.coords
+        possible_moves = []
+
+        if piece.type_code == PieceType.PAWN:
+            forward_y = pos_y - 1 if piece.color_code else pos_y + 1
+            if 0 <= forward_y < 8:
+                if occupants[forward_y * 8 + pos_x] is None:
+                    possible_moves.append((forward_y, pos_x))
+                    # from the starting row the tile two steps ahead is always in bounds
+                    double_forward_y = pos_y - 2 if piece.color_code else pos_y + 2
+                    if pos_y == (6 if piece.color_code else 1) and occupants[double_forward_y * 8 + pos_x] is None:
+                        possible_moves.append((double_forward_y, pos_x))
+
+                for destination_x in (pos_x - 1, pos_x + 1):
+                    if 0 <= destination_x < 8:
+                        destination_occupant = occupants[forward_y * 8 + destination_x]
+                        if destination_occupant is not None and destination_occupant.color_code != piece.color_code:
+                            possible_moves.append((forward_y, destination_x))
+            return possible_moves
+
+        square = pos_y * 8 + pos_x
+        move_range = piece.move_range if move_range is None else move_range
+        for move_direction in piece.move_directions if move_directions is None else move_directions:
+            for destination_y, destination_x in RAYS[move_direction][square][:move_range]:
+                destination_occupant = occupants[destination_y * 8 + destination_x]
+                if destination_occupant is None:
+                    possible_moves.append((destination_y, destination_x))
+                else:
+                    if destination_occupant.color_code != piece.color_code:
+                        possible_moves.append((destination_y, destination_x))
+                    # path is blocked, don't seek any further tiles in this direction
+                    break
+        return possible_moves
 
     def get_occupant_from_tile(self, pos_y: int, pos_x: int) -> Piece:
-        return self.get_tile(pos_y, pos_x).occupant
+        return self.grid[pos_y][pos_x].occupant
 
-    def get_occupant_by_id(self, piece_id: str) -> Piece:
+    def get_occupant_by_id(self, piece_id: int) -> Piece:
         white_piece = self.white_pieces.get(piece_id)
         return white_piece if white_piece is not None else self.black_pieces.get(piece_id)
 
     def clear(self) -> None:
-        for row_index in range(8):
-            for column_index in range(8):
-                occupant = self.get_occupant_from_tile(row_index, column_index)
-                if occupant is not None:
-                    occupant.alive = False
-                self.remove_occupant_from_tile(row_index, column_index)
+        for pieces in self.live_pieces:
+            for occupant in list(pieces):
+                occupant.alive = False
+                self._lift_occupant(occupant.coords[0], occupant.coords[1])
         self.white_pieces.clear()
         self.black_pieces.clear()
+        self.undo_depth = 0
+        self.side_to_move = Color.WHITE
+        self.zobrist_hash = 0
+        self.halfmove_clock = 0
+        self.position_counts.clear()
 
     def reset(self) -> None:
         self.clear()
@@ -95,6 +358,72 @@ class ChessBoard:
         self.add_occupant(Knight(0, 6, Color.BLACK))
         self.add_occupant(Rook(0, 7, Color.BLACK))
 
+    def load_fen(self, fen: str) -> None:
+        """
+        Sets the board up from a FEN string, reusing the board's tiles. Only piece placement, the side to move and the
+        halfmove clock are used, castling, en passant and the fullmove number are accepted but ignored. Pieces are named
+        per type and color in the order they appear in, so loading STARTING_FEN names them the same as reset does.
+        """
+        fields = fen.split()
+        if not 1 <= len(fields) <= 6:
+            raise ValueError(f"Expected 1 to 6 fields in FEN '{fen}', got {len(fields)}")
+        ranks = fields[0].split("/")
+        if len(ranks) != 8:
+            raise ValueError(f"Expected 8 ranks in FEN '{fen}', got {len(ranks)}")
+        side_to_move = fields[1] if len(fields) > 1 else "w"
+        if side_to_move not in ("w", "b"):
+            raise ValueError(f"Expected side to move 'w' or 'b' in FEN '{fen}', got '{side_to_move}'")
+        halfmove_clock = fields[4] if len(fields) > 4 else "0"
+        if not halfmove_clock.isdigit():
+            raise ValueError(f"Expected a halfmove clock in FEN '{fen}', got '{halfmove_clock}'")
+
+        placements = []
+        for pos_y, rank in enumerate(ranks):
+            pos_x = 0
+            for letter in rank:
+                if letter.isdigit():
+                    pos_x += int(letter)
+                elif letter.lower() in FEN_PIECES and pos_x < 8:
+                    placements.append((letter, pos_y, pos_x))
+                    pos_x += 1
+                else:
+                    pos_x = -1
+                    break
+            if pos_x != 8:
+                raise ValueError(f"Invalid rank '{rank}' in FEN '{fen}'")
+
+        self.clear()
+        type_counts = [[0] * (len(PieceType) + 1), [0] * (len(PieceType) + 1)]
+        for letter, pos_y, pos_x in placements:
+            color_index = 1 if letter.isupper() else 0
+            piece = FEN_PIECES[letter.lower()](pos_y, pos_x, Color.WHITE if color_index else Color.BLACK)
+            piece.short_name = f"{SHORT_NAME_PREFIXES[piece.type_code]}_{type_counts[color_index][piece.type_code]}"
+            type_counts[color_index][piece.type_code] += 1
+            self.add_occupant(piece)
+
+        self.set_side_to_move(Color.WHITE if side_to_move == "w" else Color.BLACK)
+        self.halfmove_clock = int(halfmove_clock)
+
+    def get_fen(self) -> str:
+        """
+        Returns the position as a FEN string. This engine has no castling or en passant and doesn't count full moves,
+        so those fields are always "-" and the fullmove number is always 1.
+        """
+        ranks = []
+        for pos_y in range(8):
+            rank = ""
+            empty_tiles = 0
+            for tile_code in self.tile_codes[pos_y * 8:pos_y * 8 + 8]:
+                if tile_code == 0:
+                    empty_tiles += 1
+                    continue
+                if empty_tiles:
+                    rank += str(empty_tiles)
+                    empty_tiles = 0
+                rank += FEN_LETTERS[tile_code]
+            ranks.append(rank + (str(empty_tiles) if empty_tiles else ""))
+        return f"{'/'.join(ranks)} {'w' if self.side_to_move == Color.WHITE else 'b'} - - {self.halfmove_clock} 1"
+
     def is_tile_occupied(self, pos_y: int, pos_x: int) -> bool:
         return self.get_tile(pos_y, pos_x).is_occupied()
 
@@ -102,17 +431,124 @@ class ChessBoard:
         # Checks need to be performed before calling this function to determine if move is legit
 
         if self.is_tile_occupied(pos_y, pos_x):
-            piece = self.get_occupant_from_tile(pos_y, pos_x)
-            tile = self.get_tile(pos_y, pos_x)
-            tile.remove_occupant()
+            self.position_counts[self.zobrist_hash] = self.position_counts.get(self.zobrist_hash, 0) + 1
+            piece = self._lift_occupant(pos_y, pos_x)
 
-            destination_occupant = self.get_occupant_from_tile(destination_y, destination_x)
-            if destination_occupant is not None:
+            destination_occupant = None
+            if self.is_tile_occupied(destination_y, destination_x):
+                destination_occupant = self._lift_occupant(destination_y, destination_x)
                 destination_occupant.alive = False
-            destination_tile = self.get_tile(destination_y, destination_x)
 
             piece.coords = destination_y, destination_x
-            destination_tile.add_occupant(piece)
+            self._place_occupant(piece, destination_y, destination_x)
+            self.switch_side_to_move()
+            self.halfmove_clock = 0 if destination_occupant is not None or piece.type_code == PieceType.PAWN \
+                else self.halfmove_clock + 1
+
+    def get_repetition_count(self) -> int:
+        """
+        Returns how many times the current position has occurred, counting itself. Positions are compared by hash, so
+        they also need the same side to move.
+        """
+        return self.position_counts.get(self.zobrist_hash, 0) + 1
+
+    def set_side_to_move(self, color: Color) -> None:
+        if color != self.side_to_move:
+            self.switch_side_to_move()
+
+    def switch_side_to_move(self) -> None:
+        self.side_to_move = Color.BLACK if self.side_to_move == Color.WHITE else Color.WHITE
+        self.zobrist_hash ^= SIDE_TO_MOVE_KEY
+
+    def compute_zobrist_hash(self) -> int:
+        """
+        Computes the hash of the position from scratch, it should always equal the incrementally updated zobrist_hash.
+        """
+        zobrist_hash = 0 if self.side_to_move == Color.WHITE else SIDE_TO_MOVE_KEY
+        for color_index, pieces in enumerate(self.live_pieces):
+            for piece in pieces:
+                zobrist_hash ^= PIECE_KEYS[color_index][piece.type_code][piece.coords[0] * 8 + piece.coords[1]]
+        return zobrist_hash
+
+    def make_move(self, move: (int, int, int, int), promotion_type: PieceType = None) -> int:
+        """
+        Plays a move that can later be taken back with unmake_move, e.g. to probe whether it exposes the King.
+        Unlike move_piece, captured pieces stay registered and a promotion only exists until the move is unmade.
+        :param move: (pos_y, pos_x, destination_y, destination_x), the move is assumed to be legit
+        :param promotion_type: type to promote the moving pawn to, if any
+        :return: undo token to pass to unmake_move
+        """
+        pos_y, pos_x, destination_y, destination_x = move[0], move[1], move[2], move[3]
+        zobrist_hash = self.zobrist_hash
+        halfmove_clock = self.halfmove_clock
+        self.position_counts[zobrist_hash] = self.position_counts.get(zobrist_hash, 0) + 1
+
+        piece = self._lift_occupant(pos_y, pos_x)
+        captured_piece = None
+        if self.is_tile_occupied(destination_y, destination_x):
+            captured_piece = self._lift_occupant(destination_y, destination_x)
+            captured_piece.alive = False
+
+        promoted_piece = None
+        if promotion_type is None:
+            piece.coords = destination_y, destination_x
+            self._place_occupant(piece, destination_y, destination_x)
+        else:
+            piece.alive = False
+            promoted_piece = PROMOTION_PIECES[promotion_type](destination_y, destination_x, piece.color)
+            self._place_occupant(promoted_piece, destination_y, destination_x)
+        self.switch_side_to_move()
+        self.halfmove_clock = 0 if captured_piece is not None or piece.type_code == PieceType.PAWN \
+            else halfmove_clock + 1
+
+        undo_token = self.undo_depth
+        if undo_token == len(self.undo_stack):
+            self.undo_stack.append([None] * UNDO_RECORD_SIZE)
+        record = self.undo_stack[undo_token]
+        record[UNDO_PIECE] = piece
+        record[UNDO_POS_Y] = pos_y
+        record[UNDO_POS_X] = pos_x
+        record[UNDO_DESTINATION_Y] = destination_y
+        record[UNDO_DESTINATION_X] = destination_x
+        record[UNDO_CAPTURED] = captured_piece
+        record[UNDO_PROMOTED] = promoted_piece
+        record[UNDO_ZOBRIST_HASH] = zobrist_hash
+        record[UNDO_HALFMOVE_CLOCK] = halfmove_clock
+        self.undo_depth = undo_token + 1
+
+        return undo_token
+
+    def unmake_move(self, undo_token: int) -> None:
+        if undo_token != self.undo_depth - 1:
+            raise ValueError(f"Undo token {undo_token} is not the most recent move, moves have to be unmade in the "
+                             f"reverse order they were made")
+
+        record = self.undo_stack[undo_token]
+        piece = record[UNDO_PIECE]
+        destination_y = record[UNDO_DESTINATION_Y]
+        destination_x = record[UNDO_DESTINATION_X]
+        captured_piece = record[UNDO_CAPTURED]
+
+        self._lift_occupant(destination_y, destination_x)
+        if record[UNDO_PROMOTED] is not None:
+            piece.alive = True
+        piece.coords = record[UNDO_POS_Y], record[UNDO_POS_X]
+        self._place_occupant(piece, record[UNDO_POS_Y], record[UNDO_POS_X])
+
+        if captured_piece is not None:
+            captured_piece.alive = True
+            self._place_occupant(captured_piece, destination_y, destination_x)
+
+        self.side_to_move = Color.BLACK if self.side_to_move == Color.WHITE else Color.WHITE
+        zobrist_hash = record[UNDO_ZOBRIST_HASH]
+        self.zobrist_hash = zobrist_hash
+        self.halfmove_clock = record[UNDO_HALFMOVE_CLOCK]
+        position_count = self.position_counts[zobrist_hash] - 1
+        if position_count:
+            self.position_counts[zobrist_hash] = position_count
+        else:
+            del self.position_counts[zobrist_hash]
+        self.undo_depth = undo_token
 
     def render(self) -> None:
         print("-------------------------------------------------------------------")
@@ -131,21 +567,23 @@ class ChessBoard:
         print("-------------------------------------------------------------------")
 
     def get_white_pieces(self) -> {}:
-        white_pieces = {}
-        for pos_y in range(8):
-            for pos_x in range(8):
-                piece = self.get_occupant_from_tile(pos_y, pos_x)
-                if piece is not None and piece.color == Color.WHITE:
-                    white_pieces[piece.get_id()] = piece
-
-        return white_pieces
+        return {piece.piece_id: piece for piece in self.live_pieces[1]}
 
     def get_black_pieces(self) -> {}:
-        black_pieces = {}
-        for pos_y in range(8):
-            for pos_x in range(8):
-                piece = self.get_occupant_from_tile(pos_y, pos_x)
-                if piece is not None and piece.color == Color.BLACK:
-                    black_pieces[piece.get_id()] = piece
+        return {piece.piece_id: piece for piece in self.live_pieces[0]}
+
+    def get_pieces(self, color: Color) -> [Piece]:
+        return list(self.live_pieces[self.get_color_index(color)])
+
+    def get_pieces_of_type(self, color: Color, piece_type: PieceType) -> [Piece]:
+        return list(self.live_pieces_by_type[self.get_color_index(color)][piece_type])
+
+    def count_pieces_of_type(self, color: Color, piece_type: PieceType) -> int:
+        return len(self.live_pieces_by_type[self.get_color_index(color)][piece_type])
+
+    def get_king(self, color: Color) -> Piece:
+        return self.kings[self.get_color_index(color)]
 
-        return black_pieces
+    def get_king_coords(self, color: Color) -> (int, int):
+        king = self.kings[self.get_color_index(color)]
+        return None if king is None else king.coords
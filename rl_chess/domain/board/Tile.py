@@ -2,6 +2,7 @@ from rl_chess.domain.pieces import Piece
 
 
 class Tile:
+    __slots__ = ("coords", "occupant")
 
     def __init__(self, pos_y: int, pos_x: int, occupant: Piece = None):
         self.coords = pos_y, pos_x
@@ -0,0 +1,18 @@
+"""
+Zobrist keys used by ChessBoard to hash positions.
+
+A position's hash is the XOR of the key of every piece on its tile, plus SIDE_TO_MOVE_KEY when black is to move. The
+keys are drawn from a fixed seed so hashes are stable between runs and processes, e.g. for replay deduplication.
+"""
+import random
+
+from rl_chess.enums.Enums import PieceType
+
+ZOBRIST_SEED = 0x5EED_C4E55
+
+_key_generator = random.Random(ZOBRIST_SEED)
+
+# PIECE_KEYS[color_index][type_code][square], where color_index is 0 for black and 1 for white
+PIECE_KEYS = [[[_key_generator.getrandbits(64) for _ in range(64)] for _ in range(len(PieceType) + 1)]
+              for _ in range(2)]
+SIDE_TO_MOVE_KEY = _key_generator.getrandbits(64)
@@ -1,8 +1,12 @@
 from rl_chess.domain.pieces.Piece import Piece
-from rl_chess.enums.Enums import MoveDirection, Color
+from rl_chess.enums.Enums import MoveDirection, Color, PieceType
 
 
 class Bishop(Piece):
+    __slots__ = ()
+
+    type_code = PieceType.BISHOP.value
+
     move_directions = [MoveDirection.UP_LEFT, MoveDirection.UP_RIGHT, MoveDirection.DOWN_LEFT, MoveDirection.DOWN_RIGHT]
 
     move_range = 8
@@ -1,8 +1,12 @@
 from rl_chess.domain.pieces.Piece import Piece
-from rl_chess.enums.Enums import MoveDirection, Color
+from rl_chess.enums.Enums import MoveDirection, Color, PieceType
 
 
 class Knight(Piece):
+    __slots__ = ()
+
+    type_code = PieceType.KNIGHT.value
+
     move_directions = [MoveDirection.ONE_O_CLOCK, MoveDirection.TWO_O_CLOCK, MoveDirection.FOUR_O_CLOCK,
                        MoveDirection.FIVE_O_CLOCK, MoveDirection.SEVEN_O_CLOCK, MoveDirection.EIGHT_O_CLOCK,
                        MoveDirection.TEN_O_CLOCK, MoveDirection.ELEVEN_O_CLOCK]
@@ -1,8 +1,12 @@
 from rl_chess.domain.pieces.Piece import Piece
-from rl_chess.enums.Enums import MoveDirection, Color
+from rl_chess.enums.Enums import MoveDirection, Color, PieceType
 
 
 class Pawn(Piece):
+    __slots__ = ()
+
+    type_code = PieceType.PAWN.value
+
     move_directions = [MoveDirection.UP, MoveDirection.DOWN, MoveDirection.UP_LEFT, MoveDirection.UP_RIGHT,
                        MoveDirection.DOWN_LEFT, MoveDirection.DOWN_RIGHT]
 
@@ -2,16 +2,40 @@ from rl_chess.enums.Enums import Color
 
 
 class Piece:
+    """
+    Pieces are identified by small integer codes rather than by class, so hot loops can dispatch without isinstance
+    checks: type_code is the piece's PieceType value (0 for a bare Piece) and color_code is 1 for white and 0 for black,
+    the same as ChessBoard.get_color_index.
+
+    Every piece caches its id string and an equivalent integer piece_id, both only change when short_name is
+    reassigned. Short names end in the piece's index among the pieces of its type and color, e.g. "Pa_3", so piece_id
+    packs index, type_code and color_code as index * 16 + type_code * 2 + color_code, the same for every run and
+    process. Boards key their pieces by piece_id.
+    """
+    __slots__ = ("coords", "color", "color_code", "alive", "piece_id", "__short_name", "__id")
+
+    type_code = 0
 
     def __init__(self, pos_y: int, pos_x: int, color: Color, short_name="", alive=True):
         self.coords = pos_y, pos_x
         self.color = color
+        self.color_code = 1 if color == Color.WHITE else 0
         self.alive = alive
         self.short_name = short_name
 
+    @property
+    def short_name(self) -> str:
+        return self.__short_name
+
+    @short_name.setter
+    def short_name(self, short_name: str) -> None:
+        self.__short_name = short_name
+        self.__id = f"{'W' if self.color_code else 'B'}_{short_name}"
+        index = short_name.rpartition("_")[2]
+        self.piece_id = (int(index) if index.isdigit() else 0) * 16 + self.type_code * 2 + self.color_code
+
     def get_id(self) -> str:
-        color_string = "W" if self.color == Color.WHITE else "B"
-        return f"{color_string}_{self.short_name}"
+        return self.__id
 
     def __str__(self):
         return f"{self.get_id()}: coords={self.coords}"
@@ -1,4 +1,4 @@
-from enum import Enum
+from enum import Enum, IntEnum
 
 
 class Color(Enum):
@@ -23,3 +23,21 @@ class MoveDirection(Enum):
     EIGHT_O_CLOCK = 13,
     TEN_O_CLOCK = 14,
     ELEVEN_O_CLOCK = 15
+
+
+class PieceType(IntEnum):
+    KING = 1
+    QUEEN = 2
+    BISHOP = 3
+    KNIGHT = 4
+    ROOK = 5
+    PAWN = 6
+
+
+class GameResult(Enum):
+    ONGOING = 0
+    CHECKMATE = 1
+    STALEMATE = 2
+    THREEFOLD_REPETITION = 3
+    FIFTY_MOVE_RULE = 4
+    INSUFFICIENT_MATERIAL = 5
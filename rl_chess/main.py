@@ -2,9 +2,12 @@
 # Press Double ⇧ to search everywhere for classes, files, tool windows, actions, and settings.
 from rl_chess.simulation.CheckMateSimulation import CheckMateSimulation
 from rl_chess.simulation.IntelligentSimulation import IntelligentSimulation
+from rl_chess.simulation.ParallelSelfPlaySimulation import ParallelSelfPlaySimulation
 from rl_chess.simulation.PathBlockSimulation import PathBlockSimulation
 from rl_chess.simulation.PawnPromotionSimulation import PawnPromotionSimulation
+from rl_chess.simulation.RandomPlayoutSimulation import RandomPlayoutSimulation
 from rl_chess.simulation.StandardSimulation import StandardSimulation
+from rl_chess.simulation.VectorizedSimulation import VectorizedSimulation
 
 
 if __name__ == '__main__':
@@ -12,4 +15,7 @@ if __name__ == '__main__':
     # CheckMateSimulation.run()
     # PathBlockSimulation.run()
     # PawnPromotionSimulation.run()
+    # RandomPlayoutSimulation.run()
+    # VectorizedSimulation.run()
+    # ParallelSelfPlaySimulation.run()
     IntelligentSimulation.run()
@@ -0,0 +1,78 @@
+import numpy as np
+
+
+def build_action_tuples() -> [(int, int, int, int)]:
+    action_tuples = []
+    for y_start in range(8):
+        for x_start in range(8):
+            for y_end in range(8):
+                for x_end in range(8):
+                    if y_start != y_end or x_start != x_end:
+                        action_tuples.append((y_start, x_start, y_end, x_end))
+    return action_tuples
+
+
+class ActionCodec:
+    """
+    Converts between action indices and moves, as (y_start, x_start, y_end, x_end) tuples.
+
+    Every start tile has 63 destinations, ordered by tile number and skipping itself, so action = start * 63 +
+    (end if end < start else end - 1) with tiles numbered start = y_start * 8 + x_start. All tables are built once at
+    import time:
+    - ACTION_TUPLES[action] is the move, as a tuple
+    - DECODE_TABLE[action] is the move, as a row of an (ACTION_SIZE, 4) array
+    - ENCODE_TABLE[start, end] is the action of a move between two tile numbers, -1 where start == end
+    - MOVE_TO_ACTION[move] is the action of a move tuple, the fastest lookup for the few dozen moves of a position
+    """
+
+    ACTION_TUPLES = build_action_tuples()
+    ACTION_SIZE = len(ACTION_TUPLES)
+
+    DECODE_TABLE = np.array(ACTION_TUPLES, dtype=np.int8)
+    DECODE_TABLE.flags.writeable = False
+
+    ENCODE_TABLE = np.full((64, 64), -1, dtype=np.int64)
+    ENCODE_TABLE[DECODE_TABLE[:, 0] * 8 + DECODE_TABLE[:, 1], DECODE_TABLE[:, 2] * 8 + DECODE_TABLE[:, 3]] = \
+        np.arange(ACTION_SIZE)
+    ENCODE_TABLE.flags.writeable = False
+
+    MOVE_TO_ACTION = {move: action for action, move in enumerate(ACTION_TUPLES)}
+
+    @staticmethod
+    def encode(y_start: int, x_start: int, y_end: int, x_end: int) -> int:
+        return ActionCodec.MOVE_TO_ACTION[(y_start, x_start, y_end, x_end)]
+
+    @staticmethod
+    def decode(action: int) -> (int, int, int, int):
+        return ActionCodec.ACTION_TUPLES[action]
+
+    @staticmethod
+    def encode_moves(moves) -> np.ndarray:
+        """
+        Converts a collection of move tuples, such as a legal move set, to an int64 array of actions in iteration order.
+        """
+        return np.fromiter(map(ActionCodec.MOVE_TO_ACTION.__getitem__, moves), dtype=np.int64, count=len(moves))
+
+    @staticmethod
+    def encode_array(moves: np.ndarray) -> np.ndarray:
+        """
+        Converts an (N, 4) integer array of moves to an array of N actions.
+        """
+        moves = np.asarray(moves, dtype=np.intp)
+        return ActionCodec.ENCODE_TABLE[moves[:, 0] * 8 + moves[:, 1], moves[:, 2] * 8 + moves[:, 3]]
+
+    @staticmethod
+    def decode_array(actions: np.ndarray) -> np.ndarray:
+        """
+        Converts an array of actions to an (N, 4) int8 array of moves.
+        """
+        return ActionCodec.DECODE_TABLE[actions]
+
+    @staticmethod
+    def get_action_mask(moves) -> np.ndarray:
+        """
+        Returns a boolean array over all actions that is True for every move in moves.
+        """
+        action_mask = np.zeros(ActionCodec.ACTION_SIZE, dtype=bool)
+        action_mask[ActionCodec.encode_moves(moves)] = True
+        return action_mask
@@ -2,32 +2,22 @@ import numpy as np
 
 from rl_chess.domain.board.ChessBoard import ChessBoard
 from rl_chess.domain.board.Tile import Tile
-from rl_chess.domain.pieces.Bishop import Bishop
-from rl_chess.domain.pieces.King import King
-from rl_chess.domain.pieces.Knight import Knight
-from rl_chess.domain.pieces.Queen import Queen
-from rl_chess.domain.pieces.Rook import Rook
-from rl_chess.enums.Enums import Color
+from rl_chess.enums.Enums import Color, GameResult
+from rl_chess.service.ActionCodec import ActionCodec
 from rl_chess.service.PieceMovementService import PieceMovementService
-
-
-def build_action_grid():
-    action_grid = []
-    for y_start in range(8):
-        for x_start in range(8):
-            for y_end in range(8):
-                for x_end in range(8):
-                    if y_start != y_end or x_start != x_end:
-                        action_grid.append((y_start, x_start, y_end, x_end))
-    return action_grid
+from rl_chess.service.Profiler import Profiler
+from rl_chess.service.TerminationService import TerminationService
 
 
 class AgentService:
 
-    ACTION_GRID = build_action_grid()
+    ACTION_GRID = ActionCodec.ACTION_TUPLES
+
+    STATE_SIZE = 64 + 1
+    ACTION_SIZE = ActionCodec.ACTION_SIZE
 
     piece_movement_service = PieceMovementService()
-    color_turn = Color.WHITE
+    termination_service = TerminationService(piece_movement_service)
 
     """
     Action Space
@@ -38,81 +28,92 @@ class AgentService:
     isn't allowed as it plays.
     """
 
+    def __init__(self):
+        self.color_turn = Color.WHITE
+        self.game_result = GameResult.ONGOING
+
+    def reset(self, chess_board: ChessBoard):
+        """
+        Starts a new game on the given board and returns its initial state.
+        """
+        chess_board.reset()
+        self.color_turn = Color.WHITE
+        self.game_result = GameResult.ONGOING
+        return self.get_state(chess_board)
+
     def is_action_legal(self, chess_board: ChessBoard, state, action):
-        possible_moves = self.piece_movement_service.get_possible_moves_for_all_pieces_that_can_move(self.color_turn, chess_board)
-        action_tuple = self.ACTION_GRID[action]
-        y_start = action_tuple[0]
-        x_start = action_tuple[1]
-        y_end = action_tuple[2]
-        x_end = action_tuple[3]
+        return self.ACTION_GRID[action] in self.piece_movement_service.get_legal_moves(self.color_turn, chess_board)
 
-        if chess_board.is_tile_occupied(y_start, x_start):
-            piece = chess_board.get_occupant_from_tile(y_start, x_start)
-            if piece.get_id() in possible_moves:
-                piece_possible_moves = possible_moves.get(piece.get_id())
-                if (y_end, x_end) in piece_possible_moves:
-                    return True
-                    # self.piece_movement_service.move_piece(piece, chess_board, y_end, x_end)
-        return False
+    @staticmethod
+    def get_action_index(y_start: int, x_start: int, y_end: int, x_end: int) -> int:
+        """
+        Inverse of ACTION_GRID, see ActionCodec.
+        """
+        return ActionCodec.encode(y_start, x_start, y_end, x_end)
+
+    def get_legal_actions(self, chess_board: ChessBoard) -> np.ndarray:
+        """
+        Returns an int64 array of the indices into ACTION_GRID of every action the current player can legally take.
+        """
+        return ActionCodec.encode_moves(self.piece_movement_service.get_legal_moves(self.color_turn, chess_board))
 
+    @Profiler.profile
+    def get_legal_action_mask(self, chess_board: ChessBoard) -> np.ndarray:
+        """
+        Returns a boolean array over ACTION_GRID that is True for every action the current player can legally take.
+        """
+        return ActionCodec.get_action_mask(self.piece_movement_service.get_legal_moves(self.color_turn, chess_board))
+
+    @Profiler.profile
     def step(self, chess_board: ChessBoard, action):
         """
         Figure out what move the action value represents.
         Determine if move is legal (strongly penalize if not).
         Small penalization if the game is not over.
-        Reward if move wins the game.
+        Reward if move wins the game, no reward if it ends the game in a draw. Why the game ended is kept in game_result.
         :param action:
         :return:
         """
         reward = -0.01
         done = False
 
-        action_tuple = self.ACTION_GRID[action]
+        action_tuple = ActionCodec.decode(action)
         y_start = action_tuple[0]
         x_start = action_tuple[1]
         y_end = action_tuple[2]
         x_end = action_tuple[3]
 
-        color_turn_value = (0 if self.color_turn is Color.BLACK else 1)
         self.piece_movement_service.move_piece(chess_board.get_occupant_from_tile(y_start, x_start), chess_board, y_end, x_end)
         self.color_turn = (Color.WHITE if self.color_turn is Color.BLACK else Color.BLACK)
 
         # big reward if game is won
-        if len(self.piece_movement_service.get_possible_moves_for_all_pieces_that_can_move(self.color_turn, chess_board)) < 1:
+        self.game_result = self.termination_service.get_game_result(chess_board, self.color_turn)
+        if self.game_result == GameResult.CHECKMATE:
             reward = 1
             done = True
+        elif self.game_result != GameResult.ONGOING:
+            reward = 0
+            done = True
 
         next_state = self.get_state(chess_board)
 
         return next_state, reward, done
 
+    @Profiler.profile
     def get_state(self, chess_board: ChessBoard):
         """
-        Return a 1-by-state_size numpy array show the state of the grid.
-        Every tile has its own state, encoded as:
-        - occupant piece type (where 0 is empty)
-        - color of occupant (where 0 is empty, 1 is white, 2 is black)
+        Return a 1-by-state_size float32 numpy array show the state of the grid.
+        Every tile has its own state, encoded as 10 * occupant piece type + color of occupant (where 0 is empty, 1 is
+        white and 0 is black), see get_tile_state. The board keeps these codes up to date in chess_board.tile_codes, so
+        the state is a copy of that array followed by the color to move.
         """
-        # grid_of_floats = [[10 * tile.occupant + tile.occupant.color for tile in row] for row in chess_board.grid]
-        grid_of_floats = [[self.get_tile_state(tile) for tile in row] for row in chess_board.grid]
-        grid_size = 64
-        return np.append(np.reshape(np.array(grid_of_floats), [1, grid_size]), [[(0 if self.color_turn is Color.BLACK else 1)]], axis=1)
+        state = np.empty((1, self.STATE_SIZE), dtype=np.float32)
+        state[0, :64] = chess_board.tile_codes
+        state[0, 64] = 0 if self.color_turn is Color.BLACK else 1
+        return state
 
     def get_tile_state(self, tile: Tile):
-        if tile.is_occupied():
-            if isinstance(tile.occupant, King):
-                occupant_value = 1
-            elif isinstance(tile.occupant, Queen):
-                occupant_value = 2
-            elif isinstance(tile.occupant, Bishop):
-                occupant_value = 3
-            elif isinstance(tile.occupant, Knight):
-                occupant_value = 4
-            elif isinstance(tile.occupant, Rook):
-                occupant_value = 5
-            else:  # pawn
-                occupant_value = 6
-        else:
+        occupant = tile.occupant
+        if occupant is None:
             return 0
-
-        return 10 * occupant_value + (0 if tile.occupant.color is Color.BLACK else 1)
+        return 10 * occupant.type_code + occupant.color_code
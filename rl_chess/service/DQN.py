@@ -1,22 +1,35 @@
 import random
-from collections import deque
+import time
 
 import tensorflow as tf
 import numpy as np
 from tensorflow.keras.models import Sequential
 from tensorflow.keras.layers import Dense
 
+from rl_chess.service.PrioritizedReplayBuffer import PrioritizedReplayBuffer
+from rl_chess.service.Profiler import Profiler
+from rl_chess.service.ReplayBuffer import ReplayBuffer
+
 
 class DQN:
-    def __init__(self, state_size, action_size):
+    def __init__(self, state_size, action_size, memory_size=100000, prioritized_replay=False):
+        """
+        :param prioritized_replay: sample transitions in proportion to their last TD error instead of uniformly, see
+        PrioritizedReplayBuffer
+        """
         self.state_size = state_size
         self.action_size = action_size
-        self.memory = deque(maxlen=2000)
+        self.prioritized_replay = prioritized_replay
+        if prioritized_replay:
+            self.memory = PrioritizedReplayBuffer(memory_size, state_size, action_size)
+        else:
+            self.memory = ReplayBuffer(memory_size, state_size, action_size)
         self.gamma = 0.95  # discount rate
         self.epsilon = 1.0  # exploration rate
         self.epsilon_min = 0.01
         self.epsilon_decay = 0.995
         self.learning_rate = 0.001
+        self.last_replay_time = 0.0
         self.model = self._build_model()
 
     def _build_model(self) -> Sequential:
@@ -25,32 +38,96 @@ class DQN:
         model.add(Dense(24, input_dim=self.state_size, activation='relu'))
         model.add(Dense(24, activation='relu'))
         model.add(Dense(self.action_size, activation='linear'))
-        model.compile(loss='mse', optimizer=tf.keras.optimizers.Adam(lr=self.learning_rate))
+        model.compile(loss='mse', optimizer=tf.keras.optimizers.Adam(learning_rate=self.learning_rate))
         return model
 
-    def remember(self, state, action, reward, next_state, done) -> None:
-        self.memory.append((state, action, reward, next_state, done))
+    def remember(self, state, action, reward, next_state, done, next_legal_action_mask=None) -> None:
+        """
+        :param next_legal_action_mask: boolean mask of the actions that are legal in next_state, if given only those
+        are considered when estimating the value of next_state during replay
+        """
+        self.memory.add(state, action, reward, next_state, done, next_legal_action_mask)
+
+    @Profiler.profile
+    def act(self, state, legal_action_mask=None):
+        """
+        :param legal_action_mask: boolean mask over all actions, if given the action is chosen among the legal ones only
+
+        Predictions go through predict_on_batch, predict sets up a data pipeline and callbacks on every call, which
+        costs a hundred times more than running the model on a single state.
+        """
+        if legal_action_mask is None or not legal_action_mask.any():
+            if np.random.rand() <= self.epsilon:
+                return random.randrange(self.action_size)
+            act_values = self.model.predict_on_batch(state)
+            return np.argmax(act_values[0])  # returns action
 
-    def act(self, state):
+        legal_actions = np.flatnonzero(legal_action_mask)
         if np.random.rand() <= self.epsilon:
-            return random.randrange(self.action_size)
-        act_values = self.model.predict(state)
-        return np.argmax(act_values[0])  # returns action
+            return int(np.random.choice(legal_actions))
+        act_values = self.model.predict_on_batch(state)
+        return int(legal_actions[np.argmax(act_values[0][legal_actions])])
+
+    @Profiler.profile
+    def act_batch(self, states: np.ndarray, legal_action_masks: np.ndarray = None) -> np.ndarray:
+        """
+        Picks an action for every row of states, running a single prediction for all rows that aren't exploring.
+        :param legal_action_masks: boolean array of shape (len(states), action_size), if given only legal actions are
+        picked for rows that have any
+        """
+        if legal_action_masks is None:
+            actions = np.random.randint(self.action_size, size=len(states))
+        else:
+            # a uniformly random legal action per row: the highest of random scores given to the legal actions only
+            actions = np.argmax(np.where(legal_action_masks, np.random.rand(*legal_action_masks.shape), -1), axis=1)
+
+        exploiting = np.random.rand(len(states)) > self.epsilon
+        if exploiting.any():
+            act_values = self.model.predict_on_batch(states[exploiting])
+            if legal_action_masks is not None:
+                act_values = np.where(legal_action_masks[exploiting], act_values, -np.inf)
+            actions[exploiting] = np.argmax(act_values, axis=1)
+        return actions
 
+    @Profiler.profile
     def replay(self, batch_size):
-        minibatch = random.sample(self.memory, batch_size)
-        for state, action, reward, next_state, done in minibatch:
-            target = reward
-            if not done:
-                target = (reward + self.gamma * np.amax(self.model.predict(next_state)[0]))
-            target_f = self.model.predict(state)
-            target_f[0][action] = target
-            self.model.fit(state, target_f, epochs=1, verbose=0)
+        """
+        Trains on a random minibatch of remembered transitions with a single batched prediction for the current and
+        next states and a single gradient step. With prioritized replay the minibatch is drawn by priority, the gradient
+        step is weighted by the importance-sampling weights and the priorities are updated with the new TD errors.
+        :return: seconds spent on the replay, also kept in last_replay_time
+        """
+        start_time = time.perf_counter()
+        sample_weights = None
+        if self.prioritized_replay:
+            indices, sample_weights = self.memory.sample_indices_and_weights(batch_size)
+        else:
+            indices = self.memory.sample_indices(batch_size)
+        states, actions, rewards, next_states, dones, next_legal_action_masks = self.memory.get_transitions(indices)
+
+        act_values = self.model.predict_on_batch(np.concatenate([states, next_states]))
+        target_f = np.array(act_values[:batch_size])
+        next_act_values = np.array(act_values[batch_size:])
+        if next_legal_action_masks is not None:
+            # terminal states have no legal actions, leave those unmasked rather than taking the max of nothing
+            next_legal_action_masks[~next_legal_action_masks.any(axis=1)] = True
+            next_act_values[~next_legal_action_masks] = -np.inf
+
+        targets = np.where(dones, rewards, rewards + self.gamma * np.amax(next_act_values, axis=1))
+        if self.prioritized_replay:
+            self.memory.update_priorities(indices, targets - target_f[np.arange(batch_size), actions])
+        target_f[np.arange(batch_size), actions] = targets
+        self.model.train_on_batch(states, target_f, sample_weight=sample_weights)
+
         if self.epsilon > self.epsilon_min:
             self.epsilon *= self.epsilon_decay
 
+        self.last_replay_time = time.perf_counter() - start_time
+        return self.last_replay_time
+
     def load(self, name):
         self.model.load_weights(name)
 
+    @Profiler.profile
     def save(self, name):
         self.model.save_weights(name)
\ No newline at end of file
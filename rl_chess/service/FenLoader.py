@@ -0,0 +1,53 @@
+from rl_chess.domain.board.ChessBoard import ChessBoard
+
+
+class FenLoader:
+    """
+    Streams positions from a file with one FEN per line into a fixed set of reusable boards, so loading thousands of
+    positions never allocates a new board or Tile grid. Blank lines and lines starting with '#' are skipped.
+
+    A board handed out by a generator is overwritten by a later position, after board_count more positions, so it
+    should be used or copied before then.
+    """
+
+    def __init__(self, board_count: int = 1, board_class=ChessBoard):
+        """
+        :param board_count: number of boards to cycle through, and the maximum batch size
+        :param board_class: ChessBoard or a subclass, e.g. BitBoard
+        """
+        self.chess_boards = [board_class() for _ in range(board_count)]
+        self.positions_loaded = 0
+
+    @staticmethod
+    def iterate_fens(path: str):
+        with open(path) as file:
+            for line in file:
+                fen = line.strip()
+                if fen and not fen.startswith("#"):
+                    yield fen
+
+    def iterate_positions(self, path: str):
+        """
+        Yields a board set up with every position in the file in turn.
+        """
+        for fen in self.iterate_fens(path):
+            chess_board = self.chess_boards[self.positions_loaded % len(self.chess_boards)]
+            chess_board.load_fen(fen)
+            self.positions_loaded += 1
+            yield chess_board
+
+    def iterate_batches(self, path: str):
+        """
+        Yields lists of up to board_count boards set up with the next positions in the file, e.g. to encode them with
+        PlaneEncoder. Every batch reuses the same boards.
+        """
+        batch_size = 0
+        for fen in self.iterate_fens(path):
+            self.chess_boards[batch_size].load_fen(fen)
+            self.positions_loaded += 1
+            batch_size += 1
+            if batch_size == len(self.chess_boards):
+                yield self.chess_boards
+                batch_size = 0
+        if batch_size > 0:
+            yield self.chess_boards[:batch_size]
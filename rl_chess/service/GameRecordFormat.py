@@ -0,0 +1,60 @@
+"""
+Binary format of game record files, written by GameRecordWriter and read by GameRecordReader.
+
+A file starts with a FILE_HEADER_SIZE byte header (FILE_MAGIC, then the format version and the record size as
+little-endian uint16s), followed by fixed-size RECORD_DTYPE records. Every game is stored as one game record followed by
+one move record per ply, so a game takes 4 * (plies + 1) bytes:
+- game record: kind is GAME_RECORD, info is the RESULT_* code and value is the number of plies that follow
+- move record: kind is MOVE_RECORD, info is the PieceType the pawn promoted to (0 if none) and value is the move's
+  action index, see ActionCodec
+
+Games always start from the standard starting position with white to move, and are only written once finished, so a
+file that is still being appended to can be read at any time.
+"""
+import numpy as np
+
+FILE_MAGIC = b"RLCG"
+FORMAT_VERSION = 1
+
+RECORD_DTYPE = np.dtype([("kind", "u1"), ("info", "u1"), ("value", "<u2")])
+FILE_HEADER_DTYPE = np.dtype([("magic", "S4"), ("version", "<u2"), ("record_size", "<u2")])
+FILE_HEADER_SIZE = FILE_HEADER_DTYPE.itemsize
+
+GAME_RECORD = 1
+MOVE_RECORD = 0
+
+MAX_PLIES = np.iinfo(np.uint16).max
+
+RESULT_UNFINISHED = 0
+RESULT_WHITE_WINS = 1
+RESULT_BLACK_WINS = 2
+RESULT_DRAW = 3
+
+# PGN result tags by result code
+RESULT_TAGS = {RESULT_UNFINISHED: "*", RESULT_WHITE_WINS: "1-0", RESULT_BLACK_WINS: "0-1", RESULT_DRAW: "1/2-1/2"}
+
+
+def get_file_header() -> bytes:
+    return np.array([(FILE_MAGIC, FORMAT_VERSION, RECORD_DTYPE.itemsize)], dtype=FILE_HEADER_DTYPE).tobytes()
+
+
+def check_file_header(header: bytes, path: str) -> None:
+    if len(header) < FILE_HEADER_SIZE:
+        raise ValueError(f"{path} is too short to be a game record file")
+    magic, version, record_size = np.frombuffer(header[:FILE_HEADER_SIZE], dtype=FILE_HEADER_DTYPE)[0]
+    if magic != FILE_MAGIC:
+        raise ValueError(f"{path} is not a game record file")
+    if version != FORMAT_VERSION or record_size != RECORD_DTYPE.itemsize:
+        raise ValueError(f"{path} has format version {version} with {record_size} byte records, expected version "
+                         f"{FORMAT_VERSION} with {RECORD_DTYPE.itemsize} byte records")
+
+
+def get_square_name(pos_y: int, pos_x: int) -> str:
+    return f"{'abcdefgh'[pos_x]}{8 - pos_y}"
+
+
+def get_move_name(move: (int, int, int, int)) -> str:
+    """
+    Returns the move in UCI notation without promotion, e.g. "e2e4".
+    """
+    return get_square_name(move[0], move[1]) + get_square_name(move[2], move[3])
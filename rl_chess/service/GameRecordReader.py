@@ -0,0 +1,175 @@
+import os
+import textwrap
+
+import numpy as np
+
+from rl_chess.domain.board.ChessBoard import ChessBoard
+from rl_chess.enums.Enums import Color, PieceType
+from rl_chess.service.ActionCodec import ActionCodec
+from rl_chess.service.GameRecordFormat import RECORD_DTYPE, GAME_RECORD, FILE_HEADER_SIZE, RESULT_TAGS, \
+    check_file_header, get_square_name, get_move_name
+from rl_chess.service.PawnPromotionService import PawnPromotionService
+from rl_chess.service.PieceMovementService import PieceMovementService
+
+PROMOTIONS = {
+    PieceType.QUEEN: PawnPromotionService.promote_to_queen,
+    PieceType.ROOK: PawnPromotionService.promote_to_rook,
+    PieceType.BISHOP: PawnPromotionService.promote_to_bishop,
+    PieceType.KNIGHT: PawnPromotionService.promote_to_knight,
+}
+
+# letters of the piece types in UCI and PGN notation
+PIECE_LETTERS = {PieceType.KING: "K", PieceType.QUEEN: "Q", PieceType.BISHOP: "B", PieceType.KNIGHT: "N",
+                 PieceType.ROOK: "R", PieceType.PAWN: ""}
+
+
+class GameRecordReader:
+    """
+    Reads a game record file, see GameRecordFormat, through a read-only memory map. Opening a file takes one
+    vectorized pass over the records to index where every game starts; games are only decoded when they are accessed.
+
+    reader[index] is the game's move records, a zero-copy view of the file, and reader[start:stop] a list of them.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as file:
+            check_file_header(file.read(FILE_HEADER_SIZE), path)
+
+        # the writer may be appending to the file, only read whole records
+        record_count = (os.path.getsize(path) - FILE_HEADER_SIZE) // RECORD_DTYPE.itemsize
+        if record_count > 0:
+            self.records = np.memmap(path, dtype=RECORD_DTYPE, mode="r", offset=FILE_HEADER_SIZE,
+                                     shape=(record_count,))
+        else:
+            self.records = np.zeros(0, dtype=RECORD_DTYPE)
+
+        game_offsets = np.flatnonzero(self.records["kind"] == GAME_RECORD)
+        ply_counts = self.records["value"][game_offsets].astype(np.int64)
+        # and skip a last game whose moves haven't been written completely yet
+        complete = game_offsets + 1 + ply_counts <= record_count
+        self.move_offsets = game_offsets[complete] + 1
+        self.ply_counts = ply_counts[complete]
+        self.results = np.asarray(self.records["info"][game_offsets[complete]])
+
+        self.piece_movement_service = PieceMovementService()
+
+    def __len__(self):
+        return len(self.move_offsets)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[game_index] for game_index in range(*index.indices(len(self)))]
+        move_offset = self.move_offsets[index]
+        return self.records[move_offset:move_offset + self.ply_counts[index]]
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self[index]
+
+    def get_actions(self, index: int) -> np.ndarray:
+        return self[index]["value"]
+
+    def get_moves(self, index: int) -> np.ndarray:
+        """
+        Returns the game's moves as an (plies, 4) int8 array of (pos_y, pos_x, destination_y, destination_x) rows.
+        """
+        return ActionCodec.decode_array(self.get_actions(index))
+
+    def get_result_tag(self, index: int) -> str:
+        return RESULT_TAGS[int(self.results[index])]
+
+    def replay(self, index: int, chess_board: ChessBoard, plies: int = None) -> ChessBoard:
+        """
+        Resets the board and plays the game's moves on it.
+        :param plies: number of moves to play, all of them if None
+        """
+        chess_board.reset()
+        for record in self[index][:plies]:
+            self.play_move(chess_board, ActionCodec.decode(int(record["value"])), int(record["info"]))
+        return chess_board
+
+    @staticmethod
+    def play_move(chess_board: ChessBoard, move: (int, int, int, int), promotion_type: int = 0) -> None:
+        piece = chess_board.get_occupant_from_tile(move[0], move[1])
+        chess_board.move_piece(move[0], move[1], move[2], move[3])
+        if promotion_type:
+            PROMOTIONS[promotion_type](piece, chess_board)
+
+    def get_uci_moves(self, index: int) -> [str]:
+        uci_moves = []
+        for record in self[index]:
+            uci_move = get_move_name(ActionCodec.decode(int(record["value"])))
+            if record["info"]:
+                uci_move += PIECE_LETTERS[int(record["info"])].lower()
+            uci_moves.append(uci_move)
+        return uci_moves
+
+    def get_san_moves(self, index: int) -> [str]:
+        """
+        Returns the game's moves in standard algebraic notation, as used by PGN. Replays the game to disambiguate moves
+        and mark checks.
+        """
+        chess_board = ChessBoard()
+        color = Color.WHITE
+        san_moves = []
+
+        for record in self[index]:
+            move = ActionCodec.decode(int(record["value"]))
+            promotion_type = int(record["info"])
+            piece = chess_board.get_occupant_from_tile(move[0], move[1])
+            capture = chess_board.is_tile_occupied(move[2], move[3])
+            destination = get_square_name(move[2], move[3])
+
+            if piece.type_code == PieceType.PAWN:
+                san_move = (get_square_name(move[0], move[1])[0] + "x" if capture else "") + destination
+            else:
+                rivals = [legal_move for legal_move in self.piece_movement_service.get_legal_moves(color, chess_board)
+                          if legal_move[2:] == move[2:] and legal_move[:2] != move[:2]
+                          and chess_board.get_occupant_from_tile(legal_move[0], legal_move[1]).type_code
+                          == piece.type_code]
+                start = get_square_name(move[0], move[1])
+                if not rivals:
+                    disambiguation = ""
+                elif all(rival[1] != move[1] for rival in rivals):
+                    disambiguation = start[0]
+                elif all(rival[0] != move[0] for rival in rivals):
+                    disambiguation = start[1]
+                else:
+                    disambiguation = start
+                san_move = PIECE_LETTERS[piece.type_code] + disambiguation + ("x" if capture else "") + destination
+            if promotion_type:
+                san_move += "=" + PIECE_LETTERS[promotion_type]
+
+            self.play_move(chess_board, move, promotion_type)
+            color = Color.BLACK if color == Color.WHITE else Color.WHITE
+            if self.piece_movement_service.is_king_in_check(color, chess_board):
+                san_move += "+" if self.piece_movement_service.get_legal_moves(color, chess_board) else "#"
+            san_moves.append(san_move)
+
+        return san_moves
+
+    def get_pgn(self, index: int, tags: {} = None) -> str:
+        """
+        Returns the game in PGN, with the seven tag roster filled with placeholders unless given in tags.
+        """
+        result_tag = self.get_result_tag(index)
+        pgn_tags = {"Event": "rl-chess", "Site": "?", "Date": "????.??.??", "Round": str(index + 1), "White": "?",
+                    "Black": "?", "Result": result_tag}
+        pgn_tags.update(tags or {})
+
+        move_text = []
+        for ply, san_move in enumerate(self.get_san_moves(index)):
+            move_text.append(f"{ply // 2 + 1}. {san_move}" if ply % 2 == 0 else san_move)
+        move_text.append(result_tag)
+
+        header = "".join(f'[{name} "{value}"]\n' for name, value in pgn_tags.items())
+        return header + "\n" + textwrap.fill(" ".join(move_text), width=80, break_on_hyphens=False) + "\n"
+
+    def export_pgn(self, path: str, indices=None, tags: {} = None) -> None:
+        """
+        Writes the given games, all of them if indices is None, to a PGN file.
+        """
+        with open(path, "w") as file:
+            for index in range(len(self)) if indices is None else indices:
+                file.write(self.get_pgn(index, tags) + "\n")
@@ -0,0 +1,113 @@
+import os
+
+import numpy as np
+
+from rl_chess.domain.board.ChessBoard import ChessBoard
+from rl_chess.domain.pieces.Piece import Piece
+from rl_chess.enums.Enums import PieceType
+from rl_chess.service.ActionCodec import ActionCodec
+from rl_chess.service.GameRecordFormat import RECORD_DTYPE, GAME_RECORD, MOVE_RECORD, MAX_PLIES, RESULT_UNFINISHED, \
+    FILE_HEADER_SIZE, get_file_header, check_file_header
+
+
+class GameRecordWriter:
+    """
+    Streams games to a game record file, see GameRecordFormat. Moves of the current game are collected in memory and
+    the whole game is copied into a preallocated record buffer when it ends, which is written to the file whenever it
+    fills up and on flush or close. Opening an existing file appends to it.
+
+    Usage:
+        with GameRecordWriter("games.rlg") as game_record_writer:
+            game_record_writer.start_game()
+            game_record_writer.record_move((6, 4, 4, 4))
+            game_record_writer.end_game(RESULT_WHITE_WINS)
+    """
+
+    def __init__(self, path: str, buffer_size: int = 65536):
+        """
+        :param buffer_size: number of records buffered before writing them to the file
+        """
+        self.path = path
+        self.buffer = np.zeros(buffer_size, dtype=RECORD_DTYPE)
+        self.buffered = 0
+        self.game_moves = None
+        self.games_written = 0
+
+        exists = os.path.exists(path) and os.path.getsize(path) > 0
+        if exists:
+            with open(path, "rb") as file:
+                check_file_header(file.read(FILE_HEADER_SIZE), path)
+        self.file = open(path, "ab")
+        if not exists:
+            self.file.write(get_file_header())
+
+    def start_game(self) -> None:
+        if self.game_moves is not None:
+            self.end_game(RESULT_UNFINISHED)
+        self.game_moves = []
+
+    def record_move(self, move: (int, int, int, int), promotion_type: PieceType = None) -> None:
+        """
+        :param move: (pos_y, pos_x, destination_y, destination_x)
+        :param promotion_type: type the moving pawn promoted to, if any
+        """
+        self.record_action(ActionCodec.encode(move[0], move[1], move[2], move[3]), promotion_type)
+
+    def record_action(self, action: int, promotion_type: PieceType = None) -> None:
+        if self.game_moves is None:
+            raise ValueError("Call start_game before recording moves")
+        if len(self.game_moves) == MAX_PLIES:
+            raise ValueError(f"Games can't be longer than {MAX_PLIES} plies")
+        self.game_moves.append((MOVE_RECORD, promotion_type or 0, action))
+
+    def end_game(self, result: int) -> None:
+        """
+        :param result: one of the GameRecordFormat.RESULT_* codes
+        """
+        if self.game_moves is None:
+            raise ValueError("No game was started")
+
+        record_count = len(self.game_moves) + 1
+        if self.buffered + record_count > len(self.buffer):
+            self.flush()
+        if record_count > len(self.buffer):
+            self.buffer = np.zeros(record_count, dtype=RECORD_DTYPE)
+
+        self.buffer[self.buffered] = (GAME_RECORD, result, len(self.game_moves))
+        if self.game_moves:
+            self.buffer[self.buffered + 1:self.buffered + record_count] = self.game_moves
+        self.buffered += record_count
+        self.game_moves = None
+        self.games_written += 1
+
+    def flush(self) -> None:
+        self.file.write(self.buffer[:self.buffered].tobytes())
+        self.file.flush()
+        self.buffered = 0
+
+    def close(self) -> None:
+        """
+        Writes any buffered games and closes the file, a game that is still being played is stored as unfinished.
+        """
+        if self.file.closed:
+            return
+        if self.game_moves is not None:
+            self.end_game(RESULT_UNFINISHED)
+        self.flush()
+        self.file.close()
+
+    @staticmethod
+    def get_promotion_type(piece: Piece, chess_board: ChessBoard) -> PieceType:
+        """
+        Returns the type a piece that was just moved promoted to, or None if it didn't promote. A promoted pawn is
+        taken off the board, see PawnPromotionService, and its replacement stands on the pawn's coordinates.
+        """
+        if piece.alive:
+            return None
+        return PieceType(chess_board.get_occupant_from_tile(piece.coords[0], piece.coords[1]).type_code)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
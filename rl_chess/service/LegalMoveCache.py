@@ -0,0 +1,53 @@
+from collections import OrderedDict
+
+
+class LegalMoveCache:
+    """
+    Bounded least-recently-used cache of legal move sets, keyed by a position's Zobrist hash and the color to move.
+    Entries never need to be invalidated explicitly: any change to a board changes its hash, so a mutated board simply
+    looks up a different key.
+    """
+
+    def __init__(self, max_size: int = 4096):
+        self.max_size = max_size
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: (int, int)) -> frozenset:
+        legal_moves = self.entries.get(key)
+        if legal_moves is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+            self.entries.move_to_end(key)
+        return legal_moves
+
+    def peek(self, key: (int, int)) -> frozenset:
+        """
+        Returns the entry like get, but without counting a hit or miss or marking it as recently used, for callers
+        that can answer without it and only use it opportunistically.
+        """
+        return self.entries.get(key)
+
+    def put(self, key: (int, int), legal_moves: frozenset) -> None:
+        self.entries[key] = legal_moves
+        self.entries.move_to_end(key)
+        if len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self.entries.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def get_hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups > 0 else 0.0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __str__(self):
+        return f"LegalMoveCache(size={len(self.entries)}/{self.max_size}, hits={self.hits}, misses={self.misses}, " \
+               f"hit_rate={self.get_hit_rate():.2%})"
@@ -5,16 +5,18 @@ from rl_chess.domain.pieces.Pawn import Pawn
 from rl_chess.domain.pieces.Piece import Piece
 from rl_chess.domain.pieces.Queen import Queen
 from rl_chess.domain.pieces.Rook import Rook
-from rl_chess.enums.Enums import Color
+from rl_chess.enums.Enums import PieceType
+
+PROMOTED_NAME_PREFIXES = {PieceType.QUEEN: "Qu", PieceType.ROOK: "Ro", PieceType.KNIGHT: "Kn", PieceType.BISHOP: "Bi"}
 
 
 class PawnPromotionService:
 
     @staticmethod
     def is_eligible_for_promotion(piece: Piece) -> bool:
-        if isinstance(piece, Pawn):
+        if piece.type_code == PieceType.PAWN:
             pos_y = piece.coords[0]
-            if (piece.color == Color.WHITE and pos_y == 0) or (piece.color == Color.BLACK and pos_y == 7):
+            if (piece.color_code and pos_y == 0) or (not piece.color_code and pos_y == 7):
                 return True
         else:
             return False
@@ -54,18 +56,10 @@ class PawnPromotionService:
 
     @staticmethod
     def __name_occupant(promoted_piece: Piece, chess_board: ChessBoard) -> None:
-        pieces = chess_board.white_pieces if promoted_piece.color == Color.WHITE else chess_board.black_pieces
+        pieces = chess_board.white_pieces if promoted_piece.color_code else chess_board.black_pieces
 
         # this only works if captured items have 'alive' set to False, but aren't actually removed from the map
-        if isinstance(promoted_piece, Queen):
-            type_count = len(list(filter(lambda item: isinstance(item[1], Queen), pieces.items())))
-            promoted_piece.short_name = f"Qu_{type_count}"
-        elif isinstance(promoted_piece, Rook):
-            type_count = len(list(filter(lambda item: isinstance(item[1], Rook), pieces.items())))
-            promoted_piece.short_name = f"Ro_{type_count}"
-        elif isinstance(promoted_piece, Knight):
-            type_count = len(list(filter(lambda item: isinstance(item[1], Knight), pieces.items())))
-            promoted_piece.short_name = f"Kn_{type_count}"
-        elif isinstance(promoted_piece, Bishop):
-            type_count = len(list(filter(lambda item: isinstance(item[1], Bishop), pieces.items())))
-            promoted_piece.short_name = f"Bi_{type_count}"
+        type_code = promoted_piece.type_code
+        if type_code in PROMOTED_NAME_PREFIXES:
+            type_count = sum(1 for piece in pieces.values() if piece.type_code == type_code)
+            promoted_piece.short_name = f"{PROMOTED_NAME_PREFIXES[type_code]}_{type_count}"
@@ -0,0 +1,68 @@
+import numpy as np
+
+from rl_chess.domain.board.ChessBoard import ChessBoard
+from rl_chess.enums.Enums import Color, PieceType
+from rl_chess.service.Profiler import Profiler
+from rl_chess.service.VectorizedEnvironment import VectorizedEnvironment
+
+PIECE_PLANE_COUNT = 2 * len(PieceType)
+SIDE_TO_MOVE_PLANE = PIECE_PLANE_COUNT
+PLANE_COUNT = PIECE_PLANE_COUNT + 1
+
+# tile code (see ChessBoard.tile_codes) every piece plane is set for, white pieces first in PieceType order
+PIECE_PLANE_CODES = np.array([10 * piece_type + color_index for color_index in (1, 0) for piece_type in PieceType],
+                             dtype=np.int8)
+# the same codes as a column, to compare against a board's 64 tile codes at once
+PIECE_PLANE_CODE_COLUMN = PIECE_PLANE_CODES[:, np.newaxis]
+
+
+class PlaneEncoder:
+    """
+    Encodes boards as PLANE_COUNT binary 8x8 planes, the usual input of convolutional models:
+    - planes 0 to 5 mark the white King, Queen, Bishop, Knight, Rook and Pawns, in PieceType order
+    - planes 6 to 11 mark the black pieces in the same order
+    - plane 12 is all ones if white is to move and all zeros if black is
+
+    Planes are indexed [pos_y][pos_x] like ChessBoard.grid and built from every board's tile_codes, so encoding a
+    board takes a single vectorized comparison, written straight into the output, rather than any work per tile.
+    """
+
+    @staticmethod
+    def get_piece_plane(color: Color, piece_type: PieceType) -> int:
+        return (0 if color == Color.WHITE else len(PieceType)) + piece_type - 1
+
+    @staticmethod
+    @Profiler.profile
+    def encode(boards, out: np.ndarray) -> np.ndarray:
+        """
+        Writes the planes of every board into out.
+        :param boards: list of ChessBoards, or a VectorizedEnvironment to encode all of its games
+        :param out: preallocated C-contiguous array of shape (len(boards), PLANE_COUNT, 8, 8), of any numeric or bool
+        dtype, that is overwritten entirely
+        :return: out
+        """
+        if isinstance(boards, VectorizedEnvironment):
+            boards = boards.chess_boards
+        if out.shape != (len(boards), PLANE_COUNT, 8, 8):
+            raise ValueError(f"Expected an output array of shape {(len(boards), PLANE_COUNT, 8, 8)}, got {out.shape}")
+        if not out.flags.c_contiguous:
+            raise ValueError("The output array has to be C-contiguous")
+
+        # no array is allocated, every board's planes are compared straight into its views of out
+        planes = out.reshape(len(boards), PLANE_COUNT, 64)
+        for index, chess_board in enumerate(boards):
+            board_planes = planes[index]
+            np.equal(chess_board.tile_codes, PIECE_PLANE_CODE_COLUMN, out=board_planes[:PIECE_PLANE_COUNT],
+                     casting="unsafe")
+            board_planes[SIDE_TO_MOVE_PLANE] = chess_board.side_to_move == Color.WHITE
+        return out
+
+    @staticmethod
+    def encode_board(chess_board: ChessBoard, out: np.ndarray = None) -> np.ndarray:
+        """
+        Encodes a single board into out, of shape (PLANE_COUNT, 8, 8), or into a new float32 array if out is None.
+        """
+        if out is None:
+            out = np.empty((PLANE_COUNT, 8, 8), dtype=np.float32)
+        PlaneEncoder.encode([chess_board], out[np.newaxis])
+        return out
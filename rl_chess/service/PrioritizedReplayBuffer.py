@@ -0,0 +1,63 @@
+import numpy as np
+
+from rl_chess.service.ReplayBuffer import ReplayBuffer
+from rl_chess.service.SumTree import SumTree
+
+
+class PrioritizedReplayBuffer(ReplayBuffer):
+    """
+    ReplayBuffer that samples transitions in proportion to their priority, (|TD error| + priority_epsilon) ** alpha,
+    using a SumTree over the slots. New transitions get the highest priority seen so far, so they are replayed at
+    least once before their error is known. Slots that don't hold a valid transition have priority 0.
+
+    Sampling also returns importance-sampling weights, (N * P(i)) ** -beta normalised by the largest weight in the
+    batch, with beta annealed towards 1 by beta_increment on every sample.
+    """
+
+    def __init__(self, capacity: int, state_size: int, action_size: int, alpha: float = 0.6, beta: float = 0.4,
+                 beta_increment: float = 0.0001, priority_epsilon: float = 0.01, seed: int = None,
+                 legal_actions_per_slot: int = 64):
+        super().__init__(capacity, state_size, action_size, seed, legal_actions_per_slot)
+        self.alpha = alpha
+        self.beta = beta
+        self.beta_increment = beta_increment
+        self.priority_epsilon = priority_epsilon
+        self.max_priority = 1.0
+        self.sum_tree = SumTree(capacity)
+
+    def add(self, state, action: int, reward: float, next_state, done: bool,
+            next_legal_action_mask: np.ndarray = None) -> int:
+        slot = super().add(state, action, reward, next_state, done, next_legal_action_mask)
+        # the next state's slot was just overwritten and only holds a frame, so it can't be sampled any more
+        self.sum_tree.update(np.array([slot, (slot + 1) % self.capacity]),
+                             np.array([self.max_priority ** self.alpha, 0.0]))
+        return slot
+
+    def sample_indices_and_weights(self, batch_size: int) -> (np.ndarray, np.ndarray):
+        """
+        Samples batch_size slots in proportion to their priority, stratified over equal segments of the total.
+        :return: slots and their float32 importance-sampling weights
+        """
+        if self.transition_count == 0:
+            raise ValueError("Can't sample from an empty replay buffer")
+
+        total = self.sum_tree.total()
+        segment = total / batch_size
+        values = (np.arange(batch_size) + self.random_generator.random(batch_size)) * segment
+        indices = self.sum_tree.find(np.clip(values, np.finfo(np.float64).tiny, total))
+
+        # rounding can let a lookup end on an empty slot, replace those with uniformly sampled ones
+        invalid = ~self.valid[indices]
+        if invalid.any():
+            indices[invalid] = self.sample_indices(np.count_nonzero(invalid))
+
+        probabilities = self.sum_tree.get(indices) / total
+        weights = (self.transition_count * probabilities) ** -self.beta
+        weights /= weights.max()
+        self.beta = min(1.0, self.beta + self.beta_increment)
+        return indices, weights.astype(np.float32)
+
+    def update_priorities(self, indices: np.ndarray, td_errors: np.ndarray) -> None:
+        priorities = np.abs(td_errors) + self.priority_epsilon
+        self.max_priority = max(self.max_priority, float(priorities.max()))
+        self.sum_tree.update(indices, priorities ** self.alpha)
@@ -0,0 +1,162 @@
+import cProfile
+import functools
+import os
+import sys
+import time
+
+# setting RL_CHESS_PROFILE to anything but "" or "0" enables profiling from the start, RL_CHESS_PROFILE_SAMPLE_EVERY=N
+# additionally dumps a cProfile of every Nth episode to RL_CHESS_PROFILE_DIR
+PROFILE_VARIABLE = "RL_CHESS_PROFILE"
+SAMPLE_EVERY_VARIABLE = "RL_CHESS_PROFILE_SAMPLE_EVERY"
+DUMP_DIR_VARIABLE = "RL_CHESS_PROFILE_DIR"
+DEFAULT_DUMP_DIR = "profiles"
+
+
+class Profiler:
+    """
+    Opt-in call counters and timers for the hot paths of move generation, check detection, state encoding and training.
+
+    Methods are marked with the Profiler.profile decorator, which returns them unchanged, so they cost nothing while
+    profiling is disabled. Enabling profiling, through the RL_CHESS_PROFILE environment variable or Profiler.enable,
+    replaces every marked method on its class with a wrapper that counts its calls and adds up their time, and disabling
+    it puts the original methods back. Times are inclusive, a profiled method calling another one counts for both.
+
+    Simulations report per episode with start_episode and end_episode, and at the end of the run with end_run. Every
+    sample_every-th episode is also run under cProfile and its stats are dumped to dump_dir, to be read with pstats or
+    snakeviz.
+    """
+
+    enabled = False
+    sample_every = 0
+    dump_dir = DEFAULT_DUMP_DIR
+
+    # timings[name] is [calls, seconds], for every profiled method that has been called while enabled
+    timings = {}
+    # profiled methods and their timing wrappers by name, the qualified name of the method
+    methods = {}
+
+    episode_timings = {}
+    episode_profile = None
+
+    @staticmethod
+    def profile(method):
+        """
+        Marks a method for profiling under its qualified name, e.g. "DQN.replay". Apply it below @staticmethod.
+        """
+        name = method.__qualname__
+        timings = Profiler.timings
+
+        @functools.wraps(method)
+        def timed_method(*args, **kwargs):
+            start_time = time.perf_counter()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                timing = timings.get(name)
+                if timing is None:
+                    timing = timings[name] = [0, 0.0]
+                timing[0] += 1
+                timing[1] += time.perf_counter() - start_time
+
+        Profiler.methods[name] = (method, timed_method)
+        # the class doesn't exist yet, so when profiling is already enabled the wrapper is returned right away
+        return timed_method if Profiler.enabled else method
+
+    @staticmethod
+    def enable(sample_every: int = 0, dump_dir: str = DEFAULT_DUMP_DIR) -> None:
+        """
+        :param sample_every: dump a cProfile of every sample_every-th episode, never if 0
+        :param dump_dir: directory to dump the cProfile stats to
+        """
+        Profiler.sample_every = sample_every
+        Profiler.dump_dir = dump_dir
+        if not Profiler.enabled:
+            Profiler.enabled = True
+            Profiler._install_methods()
+
+    @staticmethod
+    def enable_from_environment() -> None:
+        if os.environ.get(PROFILE_VARIABLE, "0") not in ("", "0"):
+            Profiler.enable(int(os.environ.get(SAMPLE_EVERY_VARIABLE, "0")),
+                            os.environ.get(DUMP_DIR_VARIABLE, DEFAULT_DUMP_DIR))
+
+    @staticmethod
+    def disable() -> None:
+        if Profiler.enabled:
+            Profiler.enabled = False
+            Profiler._install_methods()
+
+    @staticmethod
+    def reset() -> None:
+        Profiler.timings.clear()
+        Profiler.episode_timings = {}
+
+    @staticmethod
+    def _install_methods() -> None:
+        """
+        Sets every profiled method on its class to its timing wrapper if profiling is enabled, or back to the original
+        method if it isn't.
+        """
+        for name, (method, timed_method) in Profiler.methods.items():
+            owner = sys.modules[method.__module__]
+            owner_name, attribute = name.rsplit(".", 1)
+            for part in owner_name.split("."):
+                owner = getattr(owner, part)
+            replacement = timed_method if Profiler.enabled else method
+            if isinstance(owner.__dict__[attribute], staticmethod):
+                replacement = staticmethod(replacement)
+            setattr(owner, attribute, replacement)
+
+    @staticmethod
+    def get_timings(since: {} = None) -> {str: (int, float)}:
+        """
+        Returns (calls, seconds) for every profiled method that was called, counted since the given earlier result of
+        get_timings if any.
+        """
+        since = since or {}
+        timings = {}
+        for name, (calls, seconds) in Profiler.timings.items():
+            earlier_calls, earlier_seconds = since.get(name, (0, 0.0))
+            if calls > earlier_calls:
+                timings[name] = (calls - earlier_calls, seconds - earlier_seconds)
+        return timings
+
+    @staticmethod
+    def format_summary(title: str, timings: {str: (int, float)}) -> str:
+        lines = [f"Profile of {title}", f"  {'method':<60}{'calls':>10}{'total ms':>12}{'mean us':>11}"]
+        for name, (calls, seconds) in sorted(timings.items(), key=lambda item: -item[1][1]):
+            lines.append(f"  {name:<60}{calls:>10}{seconds * 1e3:>12.1f}{seconds * 1e6 / calls:>11.1f}")
+        return "\n".join(lines)
+
+    @staticmethod
+    def start_episode(episode: int) -> None:
+        if not Profiler.enabled:
+            return
+        Profiler.episode_timings = Profiler.get_timings()
+        if Profiler.sample_every and episode % Profiler.sample_every == 0:
+            Profiler.episode_profile = cProfile.Profile()
+            Profiler.episode_profile.enable()
+
+    @staticmethod
+    def end_episode(episode: int) -> None:
+        """
+        Prints what the profiled methods took during the episode and dumps its cProfile stats if it was sampled.
+        """
+        if not Profiler.enabled:
+            return
+        if Profiler.episode_profile is not None:
+            Profiler.episode_profile.disable()
+            os.makedirs(Profiler.dump_dir, exist_ok=True)
+            dump_path = os.path.join(Profiler.dump_dir, f"episode-{episode}.prof")
+            Profiler.episode_profile.dump_stats(dump_path)
+            Profiler.episode_profile = None
+            print(f"Dumped the profile of episode {episode} to {dump_path}")
+        print(Profiler.format_summary(f"episode {episode}", Profiler.get_timings(Profiler.episode_timings)))
+
+    @staticmethod
+    def end_run() -> None:
+        if Profiler.enabled:
+            print(Profiler.format_summary("the run", Profiler.get_timings()))
+
+
+Profiler.enable_from_environment()
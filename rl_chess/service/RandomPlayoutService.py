@@ -0,0 +1,56 @@
+import random
+
+from rl_chess.domain.board.ChessBoard import ChessBoard
+from rl_chess.enums.Enums import GameResult, PieceType
+from rl_chess.service.GameRecordWriter import GameRecordWriter
+from rl_chess.service.PieceMovementService import PieceMovementService
+from rl_chess.service.TerminationService import TerminationService
+
+
+class RandomPlayoutService:
+    """
+    Plays games of random legal moves, e.g. for Monte Carlo rollouts or to generate data. Every ply draws its move
+    with PieceMovementService.get_random_legal_move, a random piece and then a random move of it, so only the drawn
+    candidates are generated and checked for legality, and plays it with ChessBoard.make_move, so a playout can be
+    taken back entirely. Pawns always promote to a Queen.
+    """
+
+    def __init__(self, piece_movement_service: PieceMovementService = None, seed: int = None):
+        self.piece_movement_service = piece_movement_service or PieceMovementService()
+        self.termination_service = TerminationService(self.piece_movement_service)
+        self.random_generator = random.Random(seed)
+
+    def play_game(self, chess_board: ChessBoard, max_plies: int = 1000, restore: bool = False,
+                  game_record_writer: GameRecordWriter = None) -> (GameResult, []):
+        """
+        Plays random moves from the board's current position, starting with its side to move, until the game is over,
+        see TerminationService, or max_plies moves were played.
+        :param restore: unmake all moves afterwards, leaving the board in its starting position
+        :param game_record_writer: writer to record the game with, only for games played from the starting position
+        :return: the GameResult, ONGOING if the game was cut off at max_plies, and the moves played
+        """
+        undo_tokens = []
+        moves = []
+        if game_record_writer is not None:
+            game_record_writer.start_game()
+
+        game_result = self.termination_service.get_game_result(chess_board)
+        while game_result == GameResult.ONGOING and len(moves) < max_plies:
+            move = self.piece_movement_service.get_random_legal_move(chess_board.side_to_move, chess_board,
+                                                                     self.random_generator)
+            piece = chess_board.get_occupant_from_tile(move[0], move[1])
+            promotion_type = PieceType.QUEEN if piece.type_code == PieceType.PAWN and move[2] in (0, 7) else None
+            undo_tokens.append(chess_board.make_move(move, promotion_type))
+            moves.append(move)
+            if game_record_writer is not None:
+                game_record_writer.record_move(move, promotion_type)
+            game_result = self.termination_service.get_game_result(chess_board)
+
+        if game_record_writer is not None:
+            game_record_writer.end_game(TerminationService.get_result_code(game_result, chess_board.side_to_move))
+
+        if restore:
+            for undo_token in reversed(undo_tokens):
+                chess_board.unmake_move(undo_token)
+
+        return game_result, moves
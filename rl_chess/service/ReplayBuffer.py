@@ -0,0 +1,156 @@
+import numpy as np
+
+
+class ReplayBuffer:
+    """
+    Experience replay memory made of preallocated NumPy arrays used as a ring buffer.
+
+    States are stored as int8 frames. Every slot holds one frame, and the slot after a transition's state always
+    holds its next state, so a transition that continues from the previous one's next state reuses that frame instead
+    of storing it twice. Only the first state of an episode costs an extra frame. Slots that only hold a final next
+    state aren't valid transitions and are never sampled.
+
+    Legal action masks of next states are optional. A position has a few dozen legal actions out of thousands, so they
+    are stored sparsely as the indices of the legal actions, up to legal_actions_per_slot of them in a fixed-width
+    row per frame, and the rare positions with more legal actions keep theirs in an overflow dict. The rows are only
+    allocated once the first mask is added. With the defaults for chess, a 65 byte frame and 64 legal actions per
+    slot, a slot costs 74 bytes without masks and 204 bytes with them, against 578 bytes with a bit-packed mask.
+    """
+
+    def __init__(self, capacity: int, state_size: int, action_size: int, seed: int = None,
+                 legal_actions_per_slot: int = 64):
+        if capacity < 2:
+            raise ValueError(f"Capacity must be at least 2, got {capacity}")
+
+        self.capacity = capacity
+        self.state_size = state_size
+        self.action_size = action_size
+        self.random_generator = np.random.default_rng(seed)
+
+        self.frames = np.zeros((capacity, state_size), dtype=np.int8)
+        self.actions = np.zeros(capacity, dtype=np.int16 if action_size <= np.iinfo(np.int16).max else np.int32)
+        self.rewards = np.zeros(capacity, dtype=np.float32)
+        self.dones = np.zeros(capacity, dtype=bool)
+        # valid[slot] is True if slot holds the state of a transition, whose next state is in the following slot
+        self.valid = np.zeros(capacity, dtype=bool)
+
+        # legal_actions[slot, :legal_action_counts[slot]] are the legal actions of the frame in slot, unless there are
+        # more than legal_actions_per_slot of them, in which case the count is 0 and they are in
+        # overflow_legal_actions[slot]
+        self.legal_actions_per_slot = legal_actions_per_slot
+        self.legal_actions = None
+        self.legal_action_counts = None
+        self.overflow_legal_actions = {}
+        self.has_legal_action_mask = np.zeros(capacity, dtype=bool)
+
+        self.position = 0  # slot the next frame is written to
+        self.size = 0  # number of slots holding a frame
+        self.transition_count = 0  # number of valid slots
+        self.last_frame = -1  # slot of the latest next state, if the episode it belongs to may still continue
+
+    def add(self, state, action: int, reward: float, next_state, done: bool,
+            next_legal_action_mask: np.ndarray = None) -> int:
+        """
+        :return: slot of the new transition, its next state is stored in the following slot
+        """
+        state = np.asarray(state).reshape(self.state_size)
+        if self.last_frame >= 0 and np.array_equal(self.frames[self.last_frame], state):
+            slot = self.last_frame
+        else:
+            slot = self.__write_frame(state)
+
+        # write the next state before marking the transition valid, writing it invalidates whatever was in its slot
+        next_slot = self.__write_frame(np.asarray(next_state).reshape(self.state_size), next_legal_action_mask)
+
+        self.actions[slot] = action
+        self.rewards[slot] = reward
+        self.dones[slot] = done
+        self.valid[slot] = True
+        self.transition_count += 1
+        self.last_frame = -1 if done else next_slot
+        return slot
+
+    def sample(self, batch_size: int) -> (np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray):
+        """
+        Samples batch_size transitions uniformly, with replacement.
+        :return: states, actions, rewards, next_states, dones and next_legal_action_masks, where states are float32 of
+        shape (batch_size, state_size). Masks are None if no masks were added; next states without a mask get an
+        all-True one.
+        """
+        indices = self.sample_indices(batch_size)
+        return self.get_transitions(indices)
+
+    def sample_indices(self, batch_size: int) -> np.ndarray:
+        if self.transition_count == 0:
+            raise ValueError("Can't sample from an empty replay buffer")
+
+        # rejection sampling over the filled slots, most slots are valid so this rarely takes more than a few rounds
+        indices = self.random_generator.integers(0, self.size, size=batch_size)
+        invalid = ~self.valid[indices]
+        while invalid.any():
+            indices[invalid] = self.random_generator.integers(0, self.size, size=np.count_nonzero(invalid))
+            invalid = ~self.valid[indices]
+        return indices
+
+    def get_transitions(self, indices: np.ndarray) -> (np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray,
+                                                       np.ndarray):
+        next_indices = (indices + 1) % self.capacity
+
+        next_legal_action_masks = None
+        if self.legal_actions is not None:
+            next_legal_action_masks = self.__get_legal_action_masks(next_indices)
+
+        return (self.frames[indices].astype(np.float32), self.actions[indices].astype(np.int64),
+                self.rewards[indices], self.frames[next_indices].astype(np.float32), self.dones[indices],
+                next_legal_action_masks)
+
+    def get_memory_usage(self) -> int:
+        arrays = [self.frames, self.actions, self.rewards, self.dones, self.valid, self.has_legal_action_mask]
+        if self.legal_actions is not None:
+            arrays += [self.legal_actions, self.legal_action_counts]
+        arrays += self.overflow_legal_actions.values()
+        return sum(array.nbytes for array in arrays)
+
+    def __get_legal_action_masks(self, indices: np.ndarray) -> np.ndarray:
+        """
+        Expands the stored legal actions of the given slots into boolean masks, all-True for slots without a mask.
+        """
+        counts = self.legal_action_counts[indices]
+        stored = np.arange(self.legal_actions_per_slot) < counts[:, np.newaxis]
+        legal_action_masks = np.zeros((len(indices), self.action_size), dtype=bool)
+        legal_action_masks[np.repeat(np.arange(len(indices)), counts), self.legal_actions[indices][stored]] = True
+
+        if self.overflow_legal_actions:
+            for row, slot in enumerate(indices):
+                if slot in self.overflow_legal_actions:
+                    legal_action_masks[row, self.overflow_legal_actions[slot]] = True
+        legal_action_masks[~self.has_legal_action_mask[indices]] = True
+        return legal_action_masks
+
+    def __write_frame(self, frame: np.ndarray, legal_action_mask: np.ndarray = None) -> int:
+        slot = self.position
+        if self.valid[slot]:
+            self.valid[slot] = False
+            self.transition_count -= 1
+
+        self.frames[slot] = frame
+        self.overflow_legal_actions.pop(slot, None)
+        if legal_action_mask is not None:
+            if self.legal_actions is None:
+                self.legal_actions = np.zeros((self.capacity, self.legal_actions_per_slot), dtype=self.actions.dtype)
+                self.legal_action_counts = np.zeros(self.capacity, dtype=np.int16)
+            legal_actions = np.flatnonzero(legal_action_mask).astype(self.actions.dtype)
+            if len(legal_actions) > self.legal_actions_per_slot:
+                self.legal_action_counts[slot] = 0
+                self.overflow_legal_actions[slot] = legal_actions
+            else:
+                self.legal_action_counts[slot] = len(legal_actions)
+                self.legal_actions[slot, :len(legal_actions)] = legal_actions
+        self.has_legal_action_mask[slot] = legal_action_mask is not None
+
+        self.position = (slot + 1) % self.capacity
+        self.size = max(self.size, slot + 1)
+        return slot
+
+    def __len__(self):
+        return self.transition_count
@@ -0,0 +1,148 @@
+import queue
+import time
+
+from rl_chess.domain.board.ChessBoard import ChessBoard
+from rl_chess.service.AgentService import AgentService
+
+# kinds of messages actors put on the transition queue, as (kind, actor_id, payload) tuples
+TRANSITIONS_MESSAGE = "transitions"
+STATS_MESSAGE = "stats"
+STOPPED_MESSAGE = "stopped"
+
+# seconds an actor keeps trying to put its final messages on a full queue once it has been stopped
+FINAL_MESSAGE_TIMEOUT = 10
+
+
+def run_self_play_actor(actor_id: int, transition_queue, weights_queue, stop_event, max_steps: int = 500,
+                        stats_interval: int = 10) -> None:
+    """
+    Entry point of an actor process, see SelfPlayActor.
+    """
+    SelfPlayActor(actor_id, transition_queue, weights_queue, stop_event, max_steps, stats_interval).run()
+
+
+class SelfPlayActor:
+    """
+    Plays episodes with its own ChessBoard, AgentService and copy of the DQN, and streams the transitions of every
+    finished episode to the learner. The learner owns replay and training, and periodically puts (weights, epsilon)
+    on the actor's weights queue; the actor picks up the most recent ones between episodes.
+
+    The transition queue is bounded, so an actor that gets ahead of the learner waits for it to take episodes off the
+    queue before playing the next one, rather than piling up episodes the learner never gets to.
+    """
+
+    def __init__(self, actor_id: int, transition_queue, weights_queue, stop_event, max_steps: int = 500,
+                 stats_interval: int = 10):
+        self.actor_id = actor_id
+        self.transition_queue = transition_queue
+        self.weights_queue = weights_queue
+        self.stop_event = stop_event
+        self.max_steps = max_steps
+        self.stats_interval = stats_interval
+
+        self.episodes = 0
+        self.steps = 0
+        self.transitions = 0
+        self.weight_updates = 0
+
+    def run(self) -> None:
+        # TensorFlow is only imported inside the actor process, and limited to one thread so actors don't compete
+        import tensorflow as tf
+        tf.config.threading.set_intra_op_parallelism_threads(1)
+        tf.config.threading.set_inter_op_parallelism_threads(1)
+        from rl_chess.service.DQN import DQN
+
+        chess_board = ChessBoard()
+        agent_service = AgentService()
+        dqn_agent = DQN(AgentService.STATE_SIZE, AgentService.ACTION_SIZE)
+
+        start_time = time.perf_counter()
+        try:
+            while not self.stop_event.is_set():
+                if not self.__refresh_weights(dqn_agent, block=self.weight_updates == 0):
+                    continue
+
+                transitions = self.play_episode(chess_board, agent_service, dqn_agent)
+                if not self.__put((TRANSITIONS_MESSAGE, self.actor_id, transitions)):
+                    break
+                self.episodes += 1
+
+                if self.episodes % self.stats_interval == 0:
+                    self.__put((STATS_MESSAGE, self.actor_id, self.get_stats(start_time)))
+        finally:
+            # the learner drains the queue while it shuts down, but gives up on actors that don't stop in time
+            self.__put((STATS_MESSAGE, self.actor_id, self.get_stats(start_time)), timeout=FINAL_MESSAGE_TIMEOUT)
+            self.__put((STOPPED_MESSAGE, self.actor_id, None), timeout=FINAL_MESSAGE_TIMEOUT)
+
+    def play_episode(self, chess_board: ChessBoard, agent_service: AgentService, dqn_agent) -> [()]:
+        transitions = []
+        state = agent_service.reset(chess_board)
+        legal_action_mask = agent_service.get_legal_action_mask(chess_board)
+
+        for _ in range(self.max_steps):
+            if self.stop_event.is_set():
+                break
+
+            action = dqn_agent.act(state, legal_action_mask)
+            next_state, reward, done = agent_service.step(chess_board, action)
+            next_legal_action_mask = agent_service.get_legal_action_mask(chess_board)
+            transitions.append((state, action, reward, next_state, done, next_legal_action_mask))
+            self.steps += 1
+
+            if done:
+                break
+            state = next_state
+            legal_action_mask = next_legal_action_mask
+
+        self.transitions += len(transitions)
+        return transitions
+
+    def get_stats(self, start_time: float) -> {}:
+        elapsed = time.perf_counter() - start_time
+        return {
+            "episodes": self.episodes,
+            "steps": self.steps,
+            "transitions": self.transitions,
+            "weight_updates": self.weight_updates,
+            "elapsed": elapsed,
+            "steps_per_second": self.steps / elapsed if elapsed > 0 else 0.0
+        }
+
+    def __put(self, message: (), timeout: float = None) -> bool:
+        """
+        Puts a message on the transition queue, waiting while it is full.
+        :param timeout: seconds to keep waiting, whether the actor is stopped or not. Without one it waits until the
+        actor is stopped
+        :return: False if the message couldn't be put in time, it is dropped then
+        """
+        deadline = None if timeout is None else time.perf_counter() + timeout
+        while not self.stop_event.is_set() if deadline is None else time.perf_counter() < deadline:
+            try:
+                self.transition_queue.put(message, timeout=1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def __refresh_weights(self, dqn_agent, block: bool) -> bool:
+        """
+        Loads the most recent weights put on the weights queue, if any.
+        :param block: wait (while not stopped) for weights to arrive, used before the first episode
+        :return: False if blocking and no weights arrived yet
+        """
+        latest = None
+        try:
+            latest = self.weights_queue.get(timeout=1) if block else self.weights_queue.get_nowait()
+            while True:
+                latest = self.weights_queue.get_nowait()
+        except queue.Empty:
+            pass
+
+        if latest is None:
+            return not block
+
+        weights, epsilon = latest
+        dqn_agent.model.set_weights(weights)
+        dqn_agent.epsilon = epsilon
+        self.weight_updates += 1
+        return True
@@ -0,0 +1,45 @@
+import numpy as np
+
+
+class SumTree:
+    """
+    Binary tree stored in a flat array where every node holds the sum of its children, and the leaves hold one
+    priority per slot. Node 1 is the root, the children of node i are 2i and 2i + 1, and the leaf of slot s is at
+    leaf_offset + s. Updates and proportional lookups take O(log n) and are vectorised over a batch of slots.
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.leaf_offset = 1
+        while self.leaf_offset < capacity:
+            self.leaf_offset *= 2
+        self.depth = self.leaf_offset.bit_length() - 1
+        self.nodes = np.zeros(2 * self.leaf_offset, dtype=np.float64)
+
+    def total(self) -> float:
+        return self.nodes[1]
+
+    def get(self, slots: np.ndarray) -> np.ndarray:
+        return self.nodes[self.leaf_offset + slots]
+
+    def update(self, slots: np.ndarray, priorities: np.ndarray) -> None:
+        nodes = self.leaf_offset + np.asarray(slots)
+        self.nodes[nodes] = priorities
+        for _ in range(self.depth):
+            nodes = np.unique(nodes // 2)
+            self.nodes[nodes] = self.nodes[2 * nodes] + self.nodes[2 * nodes + 1]
+
+    def find(self, values: np.ndarray) -> np.ndarray:
+        """
+        Returns for every value the slot whose priority range, laid out cumulatively over the slots, contains it.
+        :param values: numbers in (0, total()]
+        """
+        nodes = np.ones(len(values), dtype=np.int64)
+        values = np.array(values, dtype=np.float64)
+        for _ in range(self.depth):
+            left_children = 2 * nodes
+            left_sums = self.nodes[left_children]
+            go_right = values > left_sums
+            values = np.where(go_right, values - left_sums, values)
+            nodes = left_children + go_right
+        return nodes - self.leaf_offset
@@ -0,0 +1,74 @@
+from rl_chess.domain.board.ChessBoard import ChessBoard
+from rl_chess.enums.Enums import Color, GameResult, PieceType
+from rl_chess.service.GameRecordFormat import RESULT_WHITE_WINS, RESULT_BLACK_WINS, RESULT_DRAW, RESULT_UNFINISHED
+from rl_chess.service.PieceMovementService import PieceMovementService
+from rl_chess.service.Profiler import Profiler
+
+# a side with any of these can still mate
+MATING_MATERIAL_TYPES = (PieceType.PAWN, PieceType.ROOK, PieceType.QUEEN)
+
+
+class TerminationService:
+    """
+    Decides whether a game is over and why. Every check is O(1) on the board's incrementally kept state (live piece
+    counts, halfmove clock and position counts), except the check for a legal move, which stops at the first one, see
+    PieceMovementService.has_any_legal_move.
+    """
+
+    def __init__(self, piece_movement_service: PieceMovementService = None):
+        self.piece_movement_service = piece_movement_service or PieceMovementService()
+
+    @Profiler.profile
+    def get_game_result(self, chess_board: ChessBoard, color: Color = None) -> GameResult:
+        """
+        :param color: the side to move, chess_board.side_to_move if None
+        :return: GameResult.ONGOING, or why the game is over. A side without legal moves is checkmated if its King is
+        in check and stalemated otherwise, which takes precedence over the draw rules.
+        """
+        color = color or chess_board.side_to_move
+
+        if not self.piece_movement_service.has_any_legal_move(color, chess_board):
+            if self.piece_movement_service.is_king_in_check(color, chess_board):
+                return GameResult.CHECKMATE
+            return GameResult.STALEMATE
+        if chess_board.halfmove_clock >= 100:
+            return GameResult.FIFTY_MOVE_RULE
+        if chess_board.get_repetition_count() >= 3:
+            return GameResult.THREEFOLD_REPETITION
+        if self.is_material_insufficient(chess_board):
+            return GameResult.INSUFFICIENT_MATERIAL
+        return GameResult.ONGOING
+
+    @staticmethod
+    def is_material_insufficient(chess_board: ChessBoard) -> bool:
+        """
+        Checks whether neither side can possibly mate: only Kings are left, plus at most a single Knight or Bishop, or
+        plus only Bishops that all stand on tiles of the same color.
+        """
+        minor_pieces = 0
+        for color_index in (0, 1):
+            pieces_by_type = chess_board.live_pieces_by_type[color_index]
+            for piece_type in MATING_MATERIAL_TYPES:
+                if pieces_by_type[piece_type]:
+                    return False
+            minor_pieces += len(pieces_by_type[PieceType.KNIGHT]) + len(pieces_by_type[PieceType.BISHOP])
+
+        if minor_pieces <= 1:
+            return True
+        black_pieces_by_type, white_pieces_by_type = chess_board.live_pieces_by_type
+        if white_pieces_by_type[PieceType.KNIGHT] or black_pieces_by_type[PieceType.KNIGHT]:
+            return False
+        bishops = list(white_pieces_by_type[PieceType.BISHOP]) + list(black_pieces_by_type[PieceType.BISHOP])
+        return len({(bishop.coords[0] + bishop.coords[1]) % 2 for bishop in bishops}) == 1
+
+    @staticmethod
+    def get_result_code(game_result: GameResult, color: Color) -> int:
+        """
+        Converts a game result to a GameRecordFormat.RESULT_* code.
+        :param color: the side to move when the game ended, which lost it if it was checkmated
+        """
+        if game_result == GameResult.ONGOING:
+            return RESULT_UNFINISHED
+        if game_result == GameResult.CHECKMATE:
+            return RESULT_BLACK_WINS if color == Color.WHITE else RESULT_WHITE_WINS
+        return RESULT_DRAW
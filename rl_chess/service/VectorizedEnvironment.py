@@ -0,0 +1,92 @@
+import numpy as np
+
+from rl_chess.domain.board.ChessBoard import ChessBoard
+from rl_chess.enums.Enums import GameResult
+from rl_chess.service.AgentService import AgentService
+
+
+class VectorizedEnvironment:
+    """
+    Steps a fixed number of independent games in lockstep, so an agent can pick the actions for all of them with a
+    single batched prediction.
+
+    Every game follows the rules of IntelligentSimulation: a legal action is played through AgentService.step, an
+    illegal one leaves the board unchanged and is penalized with illegal_action_reward. Finished games are reset
+    automatically, as are games that reach max_episode_steps without finishing.
+    """
+
+    def __init__(self, num_envs: int, max_episode_steps: int = 500, illegal_action_reward: float = -1):
+        self.num_envs = num_envs
+        self.max_episode_steps = max_episode_steps
+        self.illegal_action_reward = illegal_action_reward
+
+        self.chess_boards = [ChessBoard() for _ in range(num_envs)]
+        self.agent_services = [AgentService() for _ in range(num_envs)]
+
+        # states holds the observation every game is currently in, i.e. what the next actions are chosen from
+        self.states = np.zeros((num_envs, AgentService.STATE_SIZE), dtype=np.float32)
+        # and legal_action_masks the actions that are legal in those states
+        self.legal_action_masks = np.zeros((num_envs, AgentService.ACTION_SIZE), dtype=bool)
+        self.episode_steps = np.zeros(num_envs, dtype=np.int64)
+        # how the last step ended every game, ONGOING unless it finished, kept across the reset that follows
+        self.game_results = [GameResult.ONGOING] * num_envs
+        self.episodes_started = 0
+
+    def reset(self) -> np.ndarray:
+        for index in range(self.num_envs):
+            self.__reset_env(index)
+        return self.states.copy()
+
+    def step(self, actions: np.ndarray) -> (np.ndarray, np.ndarray, np.ndarray, np.ndarray):
+        """
+        Plays one action in every game.
+        :param actions: array of num_envs action indices into AgentService.ACTION_GRID, see ActionCodec
+        :return: next_states (num_envs, STATE_SIZE), rewards (num_envs,), dones (num_envs,) and next_legal_action_masks
+        (num_envs, ACTION_SIZE). For games that finished or were cut off at max_episode_steps, next_states and
+        next_legal_action_masks hold the final state of the game and its legal actions, taken before the reset, while
+        self.states and self.legal_action_masks already hold those of the new game.
+        """
+        next_states = np.empty_like(self.states)
+        next_legal_action_masks = np.zeros_like(self.legal_action_masks)
+        rewards = np.zeros(self.num_envs, dtype=np.float32)
+        dones = np.zeros(self.num_envs, dtype=bool)
+
+        for index in range(self.num_envs):
+            chess_board = self.chess_boards[index]
+            agent_service = self.agent_services[index]
+            action = int(actions[index])
+
+            if agent_service.is_action_legal(chess_board, self.states[index], action):
+                next_state, reward, done = agent_service.step(chess_board, action)
+                next_states[index] = next_state[0]
+            else:
+                next_states[index] = self.states[index]
+                reward = self.illegal_action_reward
+                done = False
+
+            rewards[index] = reward
+            dones[index] = done
+            self.game_results[index] = agent_service.game_result
+            next_legal_action_masks[index, agent_service.get_legal_actions(chess_board)] = True
+            self.episode_steps[index] += 1
+
+            if done or self.episode_steps[index] >= self.max_episode_steps:
+                self.__reset_env(index)
+            else:
+                self.states[index] = next_states[index]
+                self.legal_action_masks[index] = next_legal_action_masks[index]
+
+        return next_states, rewards, dones, next_legal_action_masks
+
+    def get_legal_action_masks(self) -> np.ndarray:
+        """
+        Returns a (num_envs, ACTION_SIZE) boolean array of the actions that are legal in every game's current state.
+        """
+        return self.legal_action_masks.copy()
+
+    def __reset_env(self, index: int) -> None:
+        self.states[index] = self.agent_services[index].reset(self.chess_boards[index])[0]
+        self.legal_action_masks[index] = False
+        self.legal_action_masks[index, self.agent_services[index].get_legal_actions(self.chess_boards[index])] = True
+        self.episode_steps[index] = 0
+        self.episodes_started += 1
@@ -1,13 +1,26 @@
 from rl_chess.domain.board.ChessBoard import ChessBoard
 from rl_chess.service.AgentService import AgentService
 from rl_chess.service.DQN import DQN
+from rl_chess.service.GameRecordFormat import RESULT_UNFINISHED
+from rl_chess.service.GameRecordWriter import GameRecordWriter
 from rl_chess.service.PieceMovementService import PieceMovementService
+from rl_chess.service.Profiler import Profiler
+from rl_chess.service.TerminationService import TerminationService
 
 
 class IntelligentSimulation:
 
     @staticmethod
-    def run():
+    def run(game_record_path: str = None, episodes: int = 1000, max_plies: int = 500,
+            weights_path: str = "./intelligent-simulation.weights.h5") -> int:
+        """
+        :param game_record_path: file to append every episode's game to, see GameRecordWriter
+        :param max_plies: moves after which an episode is cut off
+        :param weights_path: file the model weights are saved to every 10 episodes
+        :return: number of environment steps taken over all episodes
+
+        With profiling enabled, see Profiler, a summary is printed after every episode and at the end of the run.
+        """
         chess_board = ChessBoard()
         agent_service = AgentService()
 
@@ -16,28 +29,45 @@ class IntelligentSimulation:
 
         dqn_agent = DQN(state_size, action_size)
         batch_size = 32
-        episodes = 1000
+        steps = 0
+        game_record_writer = GameRecordWriter(game_record_path) if game_record_path is not None else None
 
         for e in range(episodes):
-            chess_board.reset()
-            state = agent_service.get_state(chess_board)
-
-            for time in range(500):
-                action = dqn_agent.act(state)
-                if agent_service.is_action_legal(chess_board, state, action):
-                    print(f'Took {time} tries for agent to pick a legal move on episode {e}')
-                    next_state, reward, done = agent_service.step(chess_board, action)
-                else:
-                    next_state = state
-                    reward = -1
-                    done = False
-                dqn_agent.remember(state, action, reward, next_state, done)
+            Profiler.start_episode(e)
+            state = agent_service.reset(chess_board)
+            legal_action_mask = agent_service.get_legal_action_mask(chess_board)
+            if game_record_writer is not None:
+                game_record_writer.start_game()
+            result = RESULT_UNFINISHED
+
+            for time in range(max_plies):
+                # the agent only picks among legal actions, so every action is a move
+                action = dqn_agent.act(state, legal_action_mask)
+                piece = chess_board.get_occupant_from_tile(*AgentService.ACTION_GRID[action][:2])
+                next_state, reward, done = agent_service.step(chess_board, action)
+                steps += 1
+                if game_record_writer is not None:
+                    game_record_writer.record_action(action, GameRecordWriter.get_promotion_type(piece, chess_board))
+                next_legal_action_mask = agent_service.get_legal_action_mask(chess_board)
+                dqn_agent.remember(state, action, reward, next_state, done, next_legal_action_mask)
+                state = next_state
+                legal_action_mask = next_legal_action_mask
                 if done:
-                    print("episode: {}/{}, score: {}, e: {:.2}"
-                          .format(e, episodes, time, dqn_agent.epsilon))
+                    result = TerminationService.get_result_code(agent_service.game_result, agent_service.color_turn)
+                    print("episode: {}/{}, score: {}, result: {}, e: {:.2}"
+                          .format(e, episodes, time, agent_service.game_result.name, dqn_agent.epsilon))
                     break
 
+            if game_record_writer is not None:
+                game_record_writer.end_game(result)
             if len(dqn_agent.memory) > batch_size:
-                dqn_agent.replay(batch_size)
+                replay_time = dqn_agent.replay(batch_size)
+                print(f"episode: {e}/{episodes}, replay took {replay_time:.3f}s")
             if e % 10 == 0:
-                dqn_agent.save("./intelligent-simulation.h5")
+                dqn_agent.save(weights_path)
+            Profiler.end_episode(e)
+
+        if game_record_writer is not None:
+            game_record_writer.close()
+        Profiler.end_run()
+        return steps
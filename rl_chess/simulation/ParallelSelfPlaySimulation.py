@@ -0,0 +1,146 @@
+import multiprocessing
+import os
+import queue
+import time
+
+from rl_chess.service.AgentService import AgentService
+from rl_chess.service.DQN import DQN
+from rl_chess.service.SelfPlayActor import run_self_play_actor, TRANSITIONS_MESSAGE, STATS_MESSAGE, STOPPED_MESSAGE
+
+
+class ParallelSelfPlaySimulation:
+    """
+    Self-play spread over several processes: every actor process plays its own games (see SelfPlayActor) while this
+    process acts as the learner, owning the replay memory, training the DQN and sending refreshed weights back to the
+    actors.
+
+    The learner stops after the given number of episodes, so the episodes still on the transition queue and the ones
+    the actors are playing at that point are dropped on purpose. They are bounded by the queue's size plus one
+    episode per actor, and reported as generated steps that weren't learned from.
+    """
+
+    @staticmethod
+    def run(num_actors: int = None, episodes: int = 1000, max_steps: int = 500, weight_sync_interval: int = 10,
+            shutdown_timeout: float = 30, queued_episodes_per_actor: int = 2):
+        """
+        :param num_actors: number of actor processes, defaults to one per core minus one for the learner
+        :param episodes: number of episodes to learn from before shutting the actors down
+        :param max_steps: maximum number of actions per episode
+        :param weight_sync_interval: number of learned episodes between weight broadcasts to the actors
+        :param shutdown_timeout: seconds to wait for actors to finish their episode before terminating them
+        :param queued_episodes_per_actor: episodes every actor may have waiting for the learner, on average, before
+        actors block until the learner catches up
+        """
+        num_actors = num_actors or max(1, (os.cpu_count() or 2) - 1)
+
+        # spawn rather than fork, TensorFlow doesn't survive being forked once it is initialised
+        context = multiprocessing.get_context("spawn")
+        # bounded, so actors can't get ahead of the learner by more than a few episodes each
+        transition_queue = context.Queue(maxsize=num_actors * queued_episodes_per_actor)
+        weights_queues = [context.Queue() for _ in range(num_actors)]
+        stop_event = context.Event()
+
+        dqn_agent = DQN(AgentService.STATE_SIZE, AgentService.ACTION_SIZE)
+        batch_size = 32
+
+        actors = [context.Process(target=run_self_play_actor, name=f"self-play-actor-{actor_id}",
+                                  args=(actor_id, transition_queue, weights_queues[actor_id], stop_event, max_steps))
+                  for actor_id in range(num_actors)]
+        for actor in actors:
+            actor.start()
+        ParallelSelfPlaySimulation.broadcast_weights(dqn_agent, weights_queues)
+
+        actor_stats = {}
+        episodes_learned = 0
+        steps_learned = 0
+        start_time = time.perf_counter()
+        try:
+            while episodes_learned < episodes:
+                try:
+                    kind, actor_id, payload = transition_queue.get(timeout=1)
+                except queue.Empty:
+                    if not any(actor.is_alive() for actor in actors):
+                        print("All actors stopped unexpectedly")
+                        break
+                    continue
+
+                if kind == TRANSITIONS_MESSAGE:
+                    for transition in payload:
+                        dqn_agent.remember(*transition)
+                    episodes_learned += 1
+                    steps_learned += len(payload)
+                    print(f"episode: {episodes_learned}/{episodes} from actor {actor_id}, steps: {len(payload)}, "
+                          f"finished: {bool(payload) and payload[-1][4]}, e: {dqn_agent.epsilon:.2}")
+
+                    if len(dqn_agent.memory) > batch_size:
+                        dqn_agent.replay(batch_size)
+                    if episodes_learned % weight_sync_interval == 0:
+                        # the actors are stopped after the last episode, so they'd never read its weights
+                        if episodes_learned < episodes:
+                            ParallelSelfPlaySimulation.broadcast_weights(dqn_agent, weights_queues)
+                        dqn_agent.save("./parallel-self-play-simulation.weights.h5")
+
+                elif kind == STATS_MESSAGE:
+                    actor_stats[actor_id] = payload
+                    ParallelSelfPlaySimulation.print_actor_stats(actor_id, payload)
+        finally:
+            ParallelSelfPlaySimulation.shut_down(actors, transition_queue, weights_queues, stop_event, actor_stats,
+                                                 shutdown_timeout)
+
+        elapsed = time.perf_counter() - start_time
+        # the episodes queued or in play at shutdown were generated but never learned from
+        generated_steps = sum(stats["steps"] for stats in actor_stats.values())
+        print(f"Learned from {episodes_learned} episodes, {steps_learned} steps in {elapsed:.1f}s "
+              f"({steps_learned / elapsed:.1f} learned steps/s)")
+        print(f"Generated {generated_steps} steps over {num_actors} actors ({generated_steps / elapsed:.1f} generated "
+              f"steps/s), {max(0, generated_steps - steps_learned)} of them weren't learned from")
+        for actor_id in sorted(actor_stats):
+            ParallelSelfPlaySimulation.print_actor_stats(actor_id, actor_stats[actor_id])
+
+    @staticmethod
+    def broadcast_weights(dqn_agent: DQN, weights_queues: []) -> None:
+        weights = dqn_agent.model.get_weights()
+        for weights_queue in weights_queues:
+            weights_queue.put((weights, dqn_agent.epsilon))
+
+    @staticmethod
+    def shut_down(actors: [], transition_queue, weights_queues: [], stop_event, actor_stats: {},
+                  shutdown_timeout: float) -> None:
+        stop_event.set()
+
+        # keep draining the queue, an actor can't exit while the data it put on the queue hasn't been consumed
+        running = {actor_id for actor_id, actor in enumerate(actors) if actor.is_alive()}
+        deadline = time.perf_counter() + shutdown_timeout
+        while running and time.perf_counter() < deadline:
+            try:
+                kind, actor_id, payload = transition_queue.get(timeout=0.5)
+            except queue.Empty:
+                running = {actor_id for actor_id in running if actors[actor_id].is_alive()}
+                continue
+            if kind == STATS_MESSAGE:
+                actor_stats[actor_id] = payload
+            elif kind == STOPPED_MESSAGE:
+                running.discard(actor_id)
+
+        for actor in actors:
+            actor.join(timeout=max(0.0, deadline - time.perf_counter()))
+            if actor.is_alive():
+                print(f"Terminating {actor.name}, it didn't stop within {shutdown_timeout}s")
+                actor.terminate()
+                actor.join()
+
+        # weights the actors never picked up would keep this process from exiting, as a queue's feeder thread waits
+        # for everything put on it to be read before the process may exit
+        for weights_queue in weights_queues:
+            try:
+                while True:
+                    weights_queue.get_nowait()
+            except queue.Empty:
+                pass
+            weights_queue.close()
+            weights_queue.cancel_join_thread()
+
+    @staticmethod
+    def print_actor_stats(actor_id: int, stats: {}) -> None:
+        print(f"actor {actor_id}: {stats['episodes']} episodes, {stats['steps']} steps, "
+              f"{stats['weight_updates']} weight updates, {stats['steps_per_second']:.1f} steps/s")
@@ -8,10 +8,16 @@ class PathBlockSimulation:
     @staticmethod
     def run():
         chess_board = ChessBoard()
-        chess_board.move_piece(0, 0, 1, 3)
-        chess_board.move_piece(7, 5, 3, 3)
+        PathBlockSimulation.set_up(chess_board)
         chess_board.render()
 
         piece_movement_service = PieceMovementService()
         possible_moves = piece_movement_service.get_possible_moves_for_all_pieces_that_can_move(Color.BLACK, chess_board)['B_Ro_0']
         print(possible_moves)
+
+    @staticmethod
+    def set_up(chess_board: ChessBoard) -> None:
+        chess_board.reset()
+        chess_board.move_piece(0, 0, 1, 3)
+        chess_board.move_piece(7, 5, 3, 3)
+        chess_board.set_side_to_move(Color.BLACK)
@@ -0,0 +1,37 @@
+import time
+
+from rl_chess.domain.board.ChessBoard import ChessBoard
+from rl_chess.enums.Enums import GameResult
+from rl_chess.service.GameRecordWriter import GameRecordWriter
+from rl_chess.service.RandomPlayoutService import RandomPlayoutService
+
+
+class RandomPlayoutSimulation:
+
+    @staticmethod
+    def run(games: int = 100, max_plies: int = 1000, seed: int = None, game_record_path: str = None):
+        """
+        Plays complete random games from the starting position without printing them, then prints how they ended.
+        :param game_record_path: file to append the games to, see GameRecordWriter
+        """
+        chess_board = ChessBoard()
+        random_playout_service = RandomPlayoutService(seed=seed)
+        game_record_writer = GameRecordWriter(game_record_path) if game_record_path is not None else None
+
+        results = {game_result: 0 for game_result in GameResult}
+        total_plies = 0
+        start_time = time.perf_counter()
+
+        for _ in range(games):
+            chess_board.reset()
+            game_result, moves = random_playout_service.play_game(chess_board, max_plies,
+                                                                  game_record_writer=game_record_writer)
+            results[game_result] += 1
+            total_plies += len(moves)
+
+        elapsed = time.perf_counter() - start_time
+        if game_record_writer is not None:
+            game_record_writer.close()
+
+        print(f"Played {games} games, {total_plies} plies in {elapsed:.1f}s ({total_plies / elapsed:.0f} plies/s)")
+        print(", ".join(f"{game_result.name.lower()}: {count}" for game_result, count in results.items()))
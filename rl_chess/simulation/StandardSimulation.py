@@ -1,21 +1,36 @@
 from rl_chess.domain.board.ChessBoard import ChessBoard
-from rl_chess.enums.Enums import Color
+from rl_chess.enums.Enums import Color, GameResult
+from rl_chess.service.GameRecordFormat import RESULT_UNFINISHED
+from rl_chess.service.GameRecordWriter import GameRecordWriter
 from rl_chess.service.PieceMovementService import PieceMovementService
+from rl_chess.service.Profiler import Profiler
+from rl_chess.service.TerminationService import TerminationService
 
 
 class StandardSimulation:
 
     @staticmethod
-    def run():
+    def run(game_record_path: str = None):
+        """
+        :param game_record_path: file to append the game to, see GameRecordWriter
+
+        With profiling enabled, see Profiler, a summary of the game is printed at the end, it counts as
+        episode 0.
+        """
         chess_board = ChessBoard()
         chess_board.render()
 
-        state = chess_board.get_state()
+        game_record_writer = None
+        if game_record_path is not None:
+            game_record_writer = GameRecordWriter(game_record_path)
+            game_record_writer.start_game()
 
         piece_movement_service = PieceMovementService()
+        termination_service = TerminationService(piece_movement_service)
         piece_movement_service.print_possible_moves_for_all_pieces_of_color(Color.WHITE, chess_board)
 
         # PLAY GAME
+        Profiler.start_episode(0)
         move_count = 1000
         white_move = True
 
@@ -23,13 +38,18 @@ class StandardSimulation:
             color = Color.WHITE if white_move else Color.BLACK
             # piece_id, possible_moves = piece_movement_service.get_possible_moves_by_piece_id(color, chess_board)
 
-            piece_id, chosen_move = piece_movement_service.get_random_possible_move_and_id(color, chess_board)
-
-            if piece_id is None:
-                print("GAME OVER")
+            game_result = termination_service.get_game_result(chess_board, color)
+            if game_result != GameResult.ONGOING:
+                print(f"GAME OVER: {game_result.name}")
                 chess_board.render()
+                if game_record_writer is not None:
+                    game_record_writer.end_game(TerminationService.get_result_code(game_result, color))
+                    game_record_writer.close()
+                Profiler.end_episode(0)
                 return
 
+            piece_id, chosen_move = piece_movement_service.get_random_possible_move_and_id(color, chess_board)
+
             pos_y, pos_x = chess_board.get_occupant_by_id(piece_id).coords
             destination_y, destination_x = chosen_move
 
@@ -37,7 +57,14 @@ class StandardSimulation:
 
             piece = chess_board.get_occupant_by_id(piece_id)
             piece_movement_service.move_piece(piece, chess_board, destination_y, destination_x)
+            if game_record_writer is not None:
+                game_record_writer.record_move((pos_y, pos_x, destination_y, destination_x),
+                                               GameRecordWriter.get_promotion_type(piece, chess_board))
 
             white_move = not white_move
 
         chess_board.render()
+        if game_record_writer is not None:
+            game_record_writer.end_game(RESULT_UNFINISHED)
+            game_record_writer.close()
+        Profiler.end_episode(0)
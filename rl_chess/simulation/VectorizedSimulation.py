@@ -0,0 +1,50 @@
+from rl_chess.enums.Enums import GameResult
+from rl_chess.service.AgentService import AgentService
+from rl_chess.service.DQN import DQN
+from rl_chess.service.VectorizedEnvironment import VectorizedEnvironment
+
+
+class VectorizedSimulation:
+
+    @staticmethod
+    def run(num_envs: int = 32, steps: int = 10000, flush_steps: int = 32):
+        """
+        :param flush_steps: number of transitions every environment collects before they are added to the replay
+        memory. Each environment's transitions are added in order, so each one's next state is stored once and reused
+        as the state of the following transition, see ReplayBuffer. Interleaving the environments step by step would
+        store both frames of every transition
+        """
+        environment = VectorizedEnvironment(num_envs)
+
+        dqn_agent = DQN(AgentService.STATE_SIZE, AgentService.ACTION_SIZE)
+        batch_size = 32
+
+        states = environment.reset()
+        legal_action_masks = environment.get_legal_action_masks()
+        pending_transitions = [[] for _ in range(num_envs)]
+        for step in range(steps):
+            actions = dqn_agent.act_batch(states, legal_action_masks)
+            # the next masks belong to next_states, also for games the environment has reset since
+            next_states, rewards, dones, next_legal_action_masks = environment.step(actions)
+
+            for index in range(num_envs):
+                pending = pending_transitions[index]
+                pending.append((states[index:index + 1], actions[index], rewards[index], next_states[index:index + 1],
+                                dones[index], next_legal_action_masks[index]))
+                if dones[index] or len(pending) >= flush_steps:
+                    for transition in pending:
+                        dqn_agent.remember(*transition)
+                    pending.clear()
+                if dones[index]:
+                    game_result = environment.game_results[index]
+                    outcome = "won" if game_result == GameResult.CHECKMATE else f"drawn by {game_result.name}"
+                    print(f"step: {step}, game {outcome} in environment {index}, e: {dqn_agent.epsilon:.2}")
+            states = environment.states.copy()
+            legal_action_masks = environment.get_legal_action_masks()
+
+            if len(dqn_agent.memory) > batch_size:
+                dqn_agent.replay(batch_size)
+            if step % 100 == 0:
+                print(f"step: {step}/{steps}, episodes started: {environment.episodes_started}, "
+                      f"last replay took {dqn_agent.last_replay_time:.3f}s")
+                dqn_agent.save("./vectorized-simulation.weights.h5")